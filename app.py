@@ -25,12 +25,22 @@ Environment Variables:
     AWS_ENDPOINT_URL_S3: S3 endpoint URL
     AWS_REGION: AWS region for S3
     BUCKET_NAME_S3: S3 bucket name for file storage
+    S3_MAX_POOL_CONNECTIONS: Concurrent S3 connections per worker process, defaults to 50
+    S3_COMPRESSION: Set to "zstd" to store samples zstd-compressed (needs the zstandard package)
+    LOG_LEVEL: Root logging level, defaults to WARNING
+    WEB_CONCURRENCY: Number of server worker processes, defaults to 2*cores+1
+    SURREALDB_POOL_SIZE: Maximum SurrealDB connections per worker process, opened on demand, defaults to 10
+    MISSION_LONG_POLL_TIMEOUT: Seconds /mission/api/get waits for a pending analysis, defaults to 25 (0 answers right away)
+    MISSION_MAX_LONG_POLLS: Waiting /mission/api/get requests per worker process before answering 503, defaults to 500
+    UDS_PATH: Serve on this Unix domain socket instead of PORT (for a same-host reverse proxy)
+    GENERIC_HOST: Subdomain prefix allowed to call the generic API, defaults to "generic."
+    GENERIC_API_KEY: API key for the generic API; requests are rejected while unset
 
 Usage:
     Run directly:
         $ python app.py
     
-    The server will start on port 5000
+    The server will start on $PORT, or on the Unix socket at $UDS_PATH when set
 
 Author: v0id_user <contact@v0id.me>
 Security Contact: CordGuard Security Team <security@cordguard.org>
@@ -38,32 +48,57 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 import logging
-from fastapi import FastAPI
 from routes.analysis_api import analysis_api_endpoint_router
 from routes.discovery_service_api import ds_api_endpoint_router
 from routes.mission_api import mission_api_endpoint_router
-from cordguard_core import init_fastapi_app
+from cordguard_core import init_fastapi_app, RequestIdFilter
 import uvicorn
-from cordguard_database import CordGuardDatabase
+from cordguard_database import CordGuardDatabase, init_db_pool, close_db_pool, get_db
 from pydantic import BaseModel
-from fastapi import HTTPException, Request
-from cordguard_utils import is_sub_host
+from fastapi import Depends, HTTPException, Request
+from cordguard_utils import is_sub_host, is_valid_api_key
 import os
-from fastapi.responses import JSONResponse
+import hashlib
+import orjson
+from functools import lru_cache
+from fastapi.responses import ORJSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.routing import Route
 from fastapi.middleware.cors import CORSMiddleware
 from routes.ai_api import ai_api_endpoint_router
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging once for the whole process. WARNING by default keeps the hot paths quiet;
+# force replaces any handler a library may have installed on the root logger during import
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'WARNING').upper()
+logging.basicConfig(level=LOG_LEVEL, force=True,
+                    format='%(levelname)s:%(name)s:[%(request_id)s] %(message)s')
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
+# Verbose error dumps are only produced in debug mode
+DEBUG = os.getenv('DEBUG') == 'true'
+
+# Generic API access settings, read once instead of on every request
+GENERIC_HOST = os.getenv('GENERIC_HOST', 'generic.')
+GENERIC_API_KEY = os.getenv('GENERIC_API_KEY', '').encode()
+if not GENERIC_API_KEY:
+    logger.error('GENERIC_API_KEY is not set, generic API requests will be rejected')
+
+# Initialize application with routers
+logger.info('Initializing application with routers')
+app = init_fastapi_app(
+    [
+        analysis_api_endpoint_router,
+        ds_api_endpoint_router,
+        mission_api_endpoint_router,
+        ai_api_endpoint_router
+    ],
     title="CordGuard API",
     description="CordGuard malware analysis REST API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
-    
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,61 +108,94 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize application with routers
-logger.info('Initializing application with routers')
-app = init_fastapi_app(app, [
-    analysis_api_endpoint_router,
-        ds_api_endpoint_router,
-        mission_api_endpoint_router,
-        ai_api_endpoint_router
-])
-    
+@app.on_event("startup")
+async def open_database_pool():
+    """
+    Open the SurrealDB connection pool before serving requests.
+
+    A database that is unreachable at boot does not stop the server; get_db() retries
+    lazily and /ping/deep keeps reporting the database state.
+    """
+    try:
+        await init_db_pool()
+    except Exception as e:
+        logger.error('Could not open the database pool at startup: %s', e)
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    await close_db_pool()
+
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """
     Handle HTTP exceptions and log request details
     """
-    logger.error(f"""
-    {exc.status_code} Error Details:
-    URL: {request.url}
-    Method: {request.method}
-    Headers: {request.headers}
-    Client Host: {request.client.host}
-    Path Params: {request.path_params}
-    Query Params: {request.query_params}
-    ---
-    Full Exception: {exc}
-    """)
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error('%s %s %s from %s: %s', exc.status_code, request.method, request.url,
+                     request.client.host if request.client else None, exc.detail)
+        if DEBUG:
+            # Full request dump only when debugging; rendering every header is costly on hot error paths
+            logger.error('Headers: %s Path Params: %s Query Params: %s',
+                         request.headers, request.path_params, request.query_params)
     
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=exc.detail if isinstance(exc.detail, dict) else {
-            "error": exc.detail if exc.detail else "Not Found",
-            "message": str(exc.detail) if exc.detail else "",
-            "path": str(request.url),
-            "method": request.method
-        }
-    )
-
-@app.get("/ping")
-async def ping(request: Request = None):
+    if isinstance(exc.detail, dict):
+        body = orjson.dumps(exc.detail)
+    else:
+        body = _error_body(exc.detail, str(request.url), request.method)
+    return Response(content=body, status_code=exc.status_code,
+                    headers=getattr(exc, 'headers', None), media_type="application/json")
+
+def _error_body(detail, url: str, method: str) -> bytes:
+    """Serialized error payload, built per response: the URL includes the query string, so it rarely repeats"""
+    return orjson.dumps({
+        "error": detail if detail else "Not Found",
+        "message": str(detail) if detail else "",
+        "path": url,
+        "method": method
+    })
+
+@lru_cache(maxsize=256)
+def _ping_body(subdomain: str, database_works: bool) -> tuple[bytes, str]:
+    """Serialized /ping/deep payload and its ETag; there are only a handful of distinct answers"""
+    body = orjson.dumps({"status": "pong", "subdomain": subdomain, "database_works": database_works})
+    return body, '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+# Liveness probe answer, served by a bare Starlette route ahead of FastAPI's routing
+_PONG_BODY = b'{"status":"pong"}'
+
+async def ping(request: Request):
+    """
+    Liveness check: the process is up and serving. Skips validation, dependencies and the database.
+    """
+    return Response(_PONG_BODY, media_type="application/json")
+
+app.router.routes.insert(0, Route("/ping", ping, methods=["GET"]))
+
+@app.get("/ping/deep")
+async def ping_deep(request: Request = None):
     """
-    Health check endpoint to verify server status.
+    Health check endpoint to verify server and database status.
 
     Returns:
-        dict: Response indicating the server is alive
+        Response: JSON indicating the server is alive, or 304 when If-None-Match matches its ETag
     """
     logger.info('Ping request received')
-    # Extract subdomain from request
-    subdomain = request.headers.get('host').split('.')[0]
-    logger.debug(f'Extracted subdomain: {subdomain}')
+    # Extract subdomain from request (first label of the host, without splitting the whole name)
+    host = request.headers.get('host') or ''
+    dot = host.find('.')
+    subdomain = host if dot < 0 else host[:dot]
+    logger.debug('Extracted subdomain: %s', subdomain)
     try:
         await CordGuardDatabase.test_connection()
         logger.info('Database connection successful')
+        database_works = True
     except Exception as e:
-        logger.error(f'Database connection failed: {e}')
-        return {"status": "pong", "subdomain": subdomain, "database_works": False}
-    return {"status": "pong", "subdomain": subdomain, "database_works": True}
+        logger.error('Database connection failed: %s', e)
+        database_works = False
+    body, etag = _ping_body(subdomain, database_works)
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, headers={"ETag": etag}, media_type="application/json")
 
 
 class WaitlistEntry(BaseModel):
@@ -135,23 +203,22 @@ class WaitlistEntry(BaseModel):
     feature: str
 
 @app.post("/feature/join-waitlist")
-async def join_waitlist(request: WaitlistEntry, full_request: Request = None):
+async def join_waitlist(request: WaitlistEntry, full_request: Request = None, db: CordGuardDatabase = Depends(get_db)):
     """
     Join the waitlist for a feature
     """
-    logger.info(f'Join waitlist request received for feature: {request.feature} from email: {request.email}')
+    logger.info('Join waitlist request received for feature: %s from email: %s', request.feature, request.email)
     
-    if not is_sub_host(full_request, os.getenv('GENERIC_HOST', 'generic.')):
+    if not is_sub_host(full_request, GENERIC_HOST):
         logger.warning('Access denied: Generic API only allowed through generic subdomain')
         raise HTTPException(status_code=403, detail="Generic API only allowed through generic subdomain")
     
-    if full_request.headers.get('x-api-key') != os.getenv('GENERIC_API_KEY'):
+    if not is_valid_api_key(full_request, GENERIC_API_KEY):
         logger.warning('Access denied: Invalid Generic API key')
         raise HTTPException(status_code=403, detail="Invalid Generic API key")
     
-    db: CordGuardDatabase = await CordGuardDatabase.create()
     record = await db.create_waitlist_entry(request.feature, request.email)
-    logger.info(f'Waitlist entry created: {record}')
+    logger.info('Waitlist entry created: %s', record)
     return {"success": record}
 
 
@@ -162,10 +229,26 @@ if __name__ == '__main__':
     # consumer_thread = threading.Thread(target=run_async_consumer, daemon=True)
     # consumer_thread.start()
 
-    PORT = os.getenv('PORT')
-    if not PORT:
-        logger.error("PORT environment variable is not set")
-        raise ValueError("PORT environment variable is not set")
-    logger.info(f'Starting FastAPI server on port {PORT}')
-    # Start FastAPI server
-    uvicorn.run("app:app", host='0.0.0.0', port=PORT)
\ No newline at end of file
+    # One worker process per core (2*cores+1, the usual sizing for I/O bound apps) unless
+    # WEB_CONCURRENCY says otherwise; DEBUG keeps a single process for local development
+    if DEBUG:
+        WORKERS = 1
+    else:
+        WORKERS = int(os.getenv('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1))
+    # Access logging is off on purpose: it costs a formatted line per request, and
+    # failures are still reported by the exception handler above. uvicorn's own logs follow LOG_LEVEL.
+    SERVER_OPTIONS = dict(workers=WORKERS, access_log=False, log_level=LOG_LEVEL.lower(), loop="uvloop", http="httptools")
+
+    UDS_PATH = os.getenv('UDS_PATH')
+    if UDS_PATH:
+        # Behind a reverse proxy on the same host, e.g. nginx with proxy_pass http://unix:/run/cordguard.sock;
+        # a Unix socket skips the loopback TCP stack entirely
+        logger.info('Starting FastAPI server on unix socket %s with %d workers', UDS_PATH, WORKERS)
+        uvicorn.run("app:app", uds=UDS_PATH, **SERVER_OPTIONS)
+    else:
+        PORT = os.getenv('PORT')
+        if not PORT:
+            logger.error("PORT environment variable is not set")
+            raise ValueError("PORT environment variable is not set")
+        logger.info('Starting FastAPI server on port %s with %d workers', PORT, WORKERS)
+        uvicorn.run("app:app", host='0.0.0.0', port=int(PORT), **SERVER_OPTIONS)
@@ -10,8 +10,10 @@ Key Components:
 
 Dependencies:
     - openai: OpenAI API client
+    - httpx: HTTP/2 transport for the OpenAI client
     - os: Environment variable access
-    - json: JSON parsing/serialization
+    - orjson: JSON parsing of model output
+    - tiktoken: Token counting for model selection
     - logging: Application logging
 
 Environment Variables:
@@ -23,14 +25,141 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 
+import asyncio
+import hashlib
+import httpx
 import openai
+import orjson
 import os
-import json
 import logging
+import tiktoken
+from dataclasses import dataclass
+from functools import cache
+from types import MappingProxyType
+from cordguard_utils import LRUCache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 
+# Structured output schema enforced on every detection, built once per process and
+# exposed read-only since every concurrent detect() call shares the same object
+_RESPONSE_FORMAT = MappingProxyType({
+    "type": "json_schema",
+    "json_schema": {
+        "name": "malicious_schema",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "malicious": {
+                    "description": "Whether the text is malicious",
+                    "type": "boolean"
+                },
+                "reason": {
+                    "description": "The reason for the decision",
+                    "type": "string"
+                },
+                "confidence": {
+                    "description": "The confidence level in the decision",
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": 100
+                },
+                "additionalProperties": False
+            }
+        }
+    }
+})
+
+def _load_prompt() -> str | None:
+    """
+    Read the PROMPT file that ships next to this module.
+
+    Returns:
+        str | None: The prompt text, or None if the file is missing or empty
+    """
+    prompt_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PROMPT")
+    try:
+        with open(prompt_path, "r") as file:
+            content = file.read()
+    except FileNotFoundError:
+        return None
+    return content if content.strip() else None
+
+try:
+    # Generated from PROMPT at image build time (see Dockerfile), so containers never touch the file
+    from cordguard_prompt import PROMPT_TEXT
+    _PROMPT = PROMPT_TEXT if PROMPT_TEXT.strip() else None
+except ImportError:
+    # Source checkouts read the file once at import; detectors share it instead of re-reading
+    _PROMPT = _load_prompt()
+
+@cache
+def _get_encoder() -> tiktoken.Encoding:
+    """
+    Return the gpt-4o tokenizer, loaded once per process.
+
+    Loading is deferred to the first call because tiktoken may fetch the BPE ranks on first use.
+    """
+    return tiktoken.encoding_for_model("gpt-4o")
+
+# Token budget of a detection. MAX_TEXT_CHARS is a cheap pre-filter on that budget, allowing 4 chars
+# per token, checked before tiktoken counts anything: longer texts are refused without calling the API.
+# The AI route checks the same limit up front.
+MAX_TEXT_TOKENS = 64800
+MAX_TEXT_CHARS = MAX_TEXT_TOKENS * 4
+# Tokenizing more than this many chars is handed to a worker thread instead of blocking the event loop
+TOKENIZE_INLINE_MAX_CHARS = 4096
+# Texts longer than this are split into windows of this size that are analyzed in parallel
+DETECTION_WINDOW_CHARS = 64 * 1024
+
+# Detection results keyed by a digest of (model, prompt, text); identical payloads skip the API call
+_DETECTION_CACHE = LRUCache(maxsize=4096)
+# Only confident verdicts are reused, borderline ones are always re-asked
+_DETECTION_CACHE_MIN_CONFIDENCE = 80
+# Folding the prompt digest into every key drops stale verdicts when the PROMPT file changes
+_PROMPT_DIGEST = hashlib.blake2b((_PROMPT or "").encode(), digest_size=16).digest()
+
+def _detection_cache_key(model: str, text: str) -> bytes:
+    """
+    Build the detection cache key for text analyzed by model under the current prompt.
+    """
+    hasher = hashlib.blake2b(_PROMPT_DIGEST, digest_size=32)
+    hasher.update(model.encode())
+    hasher.update(b"\0")
+    hasher.update(text.encode())
+    return hasher.digest()
+
+# Shared OpenAI client, created on first use so importing this module does not require credentials
+_SHARED_CLIENT: openai.AsyncOpenAI | None = None
+
+def _create_http_client() -> httpx.AsyncClient:
+    """
+    Build the HTTP/2 client the OpenAI SDK sends requests through.
+
+    HTTP/2 multiplexes concurrent detections (see detect_many) over one TLS connection
+    instead of opening a connection per in-flight request.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    # DefaultAsyncHttpxClient keeps the SDK's own timeout and redirect defaults
+    return openai.DefaultAsyncHttpxClient(transport=transport)
+
+def _get_shared_client() -> openai.AsyncOpenAI:
+    """
+    Return the process-wide OpenAI client, creating it on first call.
+
+    Reusing one client keeps its HTTP connection pool (and TLS sessions) warm across detections.
+    """
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None:
+        _SHARED_CLIENT = openai.AsyncOpenAI(http_client=_create_http_client())
+    return _SHARED_CLIENT
+
+class TextTooLargeError(ValueError):
+    """Raised by detect() for texts over MAX_TEXT_CHARS, which are never given a verdict"""
+
+@dataclass(slots=True)
 class OpenAIResponse:
     """
     Structured response class for OpenAI API results.
@@ -49,22 +178,22 @@ class OpenAIResponse:
     reason: str 
     confidence: int
 
-    @staticmethod
-    def from_dict(dict: dict) -> 'OpenAIResponse':
+    @classmethod
+    def from_dict(cls, data: dict) -> 'OpenAIResponse':
         """
         Creates an OpenAIResponse instance from a dictionary.
 
         Args:
-            dict (dict): Dictionary containing malicious, reason and confidence keys
+            data (dict): Dictionary containing malicious, reason and confidence keys
 
         Returns:
             OpenAIResponse: New instance populated with dictionary values
         """
-        openai_response = OpenAIResponse()
-        openai_response.malicious = dict["malicious"]
-        openai_response.reason = dict["reason"]
-        openai_response.confidence = dict["confidence"]
-        return openai_response
+        return cls(
+            malicious=data["malicious"],
+            reason=data["reason"],
+            confidence=data["confidence"]
+        )
 
     def get_dict(self):
         """
@@ -87,19 +216,22 @@ class OpenAIMaliciousTextDetector:
     if it contains malicious content. Results include confidence scores and reasoning.
 
     Attributes:
-        client (openai.OpenAI): OpenAI API client instance
+        client (openai.AsyncOpenAI): Async OpenAI API client instance
         prompt (str): Pre-defined prompt loaded from PROMPT file
 
     Methods:
         detect: Analyzes text for malicious content using OpenAI API
+        detect_many: Analyzes several texts concurrently
+        combine_responses: Merges per-window verdicts of a long text
     """
 
-    def __init__(self, model="gpt-4o", auto_model=False, key=None):
+    def __init__(self, model="gpt-4o", auto_model=False, key=None, max_concurrency=8):
         """
         Initialize the detector with OpenAI API credentials.
 
         Args:
             key (str, optional): OpenAI API key. If None, reads from environment variable.
+            max_concurrency (int, optional): Upper bound on in-flight API calls in detect_many
 
         Raises:
             ValueError: If no API key is provided or found in environment
@@ -108,17 +240,15 @@ class OpenAIMaliciousTextDetector:
             openai_api_key = os.getenv("OPENAI_API_KEY")
             if not openai_api_key:
                 raise ValueError("OPENAI_API_KEY is not set")
-        self.client = openai.OpenAI()
+            self.client = _get_shared_client()
+        else:
+            self.client = openai.AsyncOpenAI(api_key=key, http_client=_create_http_client())
         self.model = model
-        try:
-            with open("PROMPT", "r") as file:
-                content = file.read()
-                if not content.strip():
-                    raise ValueError("PROMPT file is empty")
-                self.prompt = content
-        except FileNotFoundError:
-            raise ValueError("PROMPT file not found")
+        if _PROMPT is None:
+            raise ValueError("PROMPT file not found or empty")
+        self.prompt = _PROMPT
         self.auto_model = auto_model
+        self.max_concurrency = max_concurrency
         logging.info("OpenAIMaliciousTextDetector initialized with prompt loaded.")
     def calculate_token_count(self, text: str) -> int:
         """
@@ -128,12 +258,12 @@ class OpenAIMaliciousTextDetector:
             text (str): The text to analyze
             
         Returns:
-            int: Estimated token count
+            int: Token count under the gpt-4o tokenizer
         """
-        # Rough estimation: ~4 chars per token
-        return len(text) // 4
+        # encode_ordinary skips the special-token scan, which we never need for user text
+        return len(_get_encoder().encode_ordinary(text))
 
-    def detect(self, text: str) -> OpenAIResponse:
+    async def detect(self, text: str) -> OpenAIResponse:
         """
         Analyze text for malicious content using OpenAI's API.
 
@@ -146,16 +276,34 @@ class OpenAIMaliciousTextDetector:
         Returns:
             OpenAIResponse: Structured response containing analysis results
 
+        Raises:
+            TextTooLargeError: If text is longer than MAX_TEXT_CHARS
+
         Note:
-            Uses GPT-4 model and enforces a specific JSON schema for responses
+            Uses GPT-4 model and enforces a specific JSON schema for responses.
+            The call is awaited on the async client so it never blocks the event loop.
         """
         logging.info("Detecting malicious text...")
+        if len(text) > MAX_TEXT_CHARS:
+            logging.warning("Text of %d chars exceeds the %d char limit, refusing detection", len(text), MAX_TEXT_CHARS)
+            raise TextTooLargeError(f"Text exceeds {MAX_TEXT_CHARS} chars")
+        if len(text) > DETECTION_WINDOW_CHARS:
+            # One long completion is slower than several short ones running side by side
+            windows = [text[i:i + DETECTION_WINDOW_CHARS] for i in range(0, len(text), DETECTION_WINDOW_CHARS)]
+            logging.info("Splitting %d chars into %d detection windows", len(text), len(windows))
+            return self.combine_responses(await self.detect_many(windows))
+
         HARDCODED_MINI_TOKEN_COUNT = 2048
         HARDCODED_MINI_COST = 0.001
         HARDCODED_O_COST = 0.01
+        # Chosen per call so concurrent detections on a shared detector never race on self.model
+        model = self.model
         if self.auto_model:
-            # Calculate tokens and costs
-            tokens = self.calculate_token_count(text)
+            # Calculate tokens and costs; tiktoken releases the GIL, so long texts tokenize off the loop
+            if len(text) > TOKENIZE_INLINE_MAX_CHARS:
+                tokens = await asyncio.to_thread(self.calculate_token_count, text)
+            else:
+                tokens = self.calculate_token_count(text)
             
             # GPT-4o: $0.01/1K tokens, more accurate
             # GPT-4o-mini: $0.001/1K tokens, less accurate
@@ -164,53 +312,72 @@ class OpenAIMaliciousTextDetector:
             
             # Use mini for larger texts to save costs
             if tokens > HARDCODED_MINI_TOKEN_COUNT:
-                self.model = "gpt-4o-mini"
-                logging.info(f"Using gpt-4o-mini for {tokens} tokens (cost: ~${gpt4o_mini_cost:.4f})")
+                model = "gpt-4o-mini"
+                logging.info("Using gpt-4o-mini for %d tokens (cost: ~$%.4f)", tokens, gpt4o_mini_cost)
             else:
-                self.model = "gpt-4o" 
-                logging.info(f"Using gpt-4o for {tokens} tokens (cost: ~${gpt4o_cost:.4f})")
+                model = "gpt-4o"
+                logging.info("Using gpt-4o for %d tokens (cost: ~$%.4f)", tokens, gpt4o_cost)
+
+        cache_key = _detection_cache_key(model, text)
+        cached_response = _DETECTION_CACHE.get(cache_key)
+        if cached_response is not None:
+            logging.info("Detection served from cache.")
+            return cached_response
 
-        completion = self.client.chat.completions.create(
-            model=self.model,
+        completion = await self.client.chat.completions.create(
+            model=model,
             messages=[
                 {"role": "system", "content": self.prompt},
                 {"role": "user", "content": text}
             ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "malicious_schema",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "malicious": {
-                                "description": "Whether the text is malicious",
-                                "type": "boolean"
-                            },
-                            "reason": {
-                                "description": "The reason for the decision",
-                                "type": "string"
-                            },
-                            "confidence": {
-                                "description": "The confidence level in the decision",
-                                "type": "integer",
-                                "minimum": 0,
-                                "maximum": 100
-                            },
-                            "additionalProperties": False
-                        }
-                    }
-                }
-            },
+            response_format=_RESPONSE_FORMAT,
         )
         logging.info("Received response from OpenAI API.")
-        aiResponse = completion.choices[0].message.model_dump_json()
-        jsonResponse = json.loads(aiResponse)
-        content = json.loads(jsonResponse["content"])
-        
-        openai_response = OpenAIResponse()
-        openai_response.malicious = content["malicious"]
-        openai_response.reason = content["reason"]
-        openai_response.confidence = content["confidence"]
-        logging.info(f"Detection result: {openai_response.get_dict()}")
+        content = orjson.loads(completion.choices[0].message.content)
+
+        openai_response = OpenAIResponse.from_dict(content)
+        if openai_response.confidence >= _DETECTION_CACHE_MIN_CONFIDENCE:
+            _DETECTION_CACHE.set(cache_key, openai_response)
+        logging.info("Detection result: %s", openai_response)
         return openai_response
+
+    async def detect_many(self, texts: list[str]) -> list[OpenAIResponse]:
+        """
+        Analyze several texts concurrently.
+
+        All detections are started at once and gathered, with at most max_concurrency
+        API calls in flight so bursts stay under the OpenAI rate limits.
+
+        Args:
+            texts (list[str]): The texts to analyze
+
+        Returns:
+            list[OpenAIResponse]: One result per text, in the same order as texts
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def detect_one(text: str) -> OpenAIResponse:
+            async with semaphore:
+                return await self.detect(text)
+
+        return await asyncio.gather(*(detect_one(text) for text in texts))
+
+    @staticmethod
+    def combine_responses(responses: list[OpenAIResponse]) -> OpenAIResponse:
+        """
+        Merge the verdicts of the windows of one text into a single verdict.
+
+        Any malicious window makes the whole text malicious, reported with the most confident
+        malicious verdict; otherwise the least confident clean verdict is kept, so one uncertain
+        window is not hidden behind confident ones.
+
+        Args:
+            responses (list[OpenAIResponse]): Verdicts of the individual windows
+
+        Returns:
+            OpenAIResponse: The combined verdict
+        """
+        malicious_responses = [response for response in responses if response.malicious]
+        if malicious_responses:
+            return max(malicious_responses, key=lambda response: response.confidence)
+        return min(responses, key=lambda response: response.confidence)
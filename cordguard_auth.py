@@ -10,20 +10,92 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 import os
+import asyncio
 import logging
+from functools import cache, lru_cache
+from typing import NamedTuple
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes, PrivateKeyTypes
-from cryptography.exceptions import InvalidSignature
+import nacl.signing
+import nacl.exceptions
+from cordguard_utils import LRUCache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_PRIVATE_KEY_PATH = os.path.join(_MODULE_DIR, "keys/server/ed25519_private_key.pem")
+_DEFAULT_PUBLIC_KEY_PATH = os.path.join(_MODULE_DIR, "keys/server/ed25519_public_key.pem")
+
+# Valid (message, signature) pairs remembered by verify_cached; worker HWIDs and their
+# signatures do not change while a VM lives, so each worker is verified about once per TTL
+VERIFY_CACHE_SIZE = 10_000
+VERIFY_CACHE_TTL = 3600
+
 class AsymmetricKeysTypes:
     """Supported asymmetric key types"""
     ED25519 = "ed25519"
 
+class _Ed25519Keys(NamedTuple):
+    """A loaded Ed25519 key pair, shared by every CordguardAuth using the same key files"""
+    public_key: ed25519.Ed25519PublicKey
+    private_key: ed25519.Ed25519PrivateKey
+    signing_key: nacl.signing.SigningKey
+    verify_key: nacl.signing.VerifyKey
+
+@lru_cache(maxsize=8)
+def _load_ed25519_keys(private_key_path: str, public_key_path: str, private_key_mtime: int, public_key_mtime: int) -> _Ed25519Keys:
+    """
+    Read and parse an Ed25519 key pair from PEM files
+    
+    Besides the cryptography key objects, libsodium (PyNaCl) keys are built from the same
+    raw key material, as libsodium signs and verifies faster than the OpenSSL backend.
+    
+    Args:
+        private_key_path (str): Path to the private key file
+        public_key_path (str): Path to the public key file
+        private_key_mtime (int): Modification time of the private key file, only used as part of the cache key
+        public_key_mtime (int): Modification time of the public key file, only used as part of the cache key
+        
+    Returns:
+        _Ed25519Keys: The loaded public and private keys with the matching libsodium signing and verify keys
+    """
+    public_key: PublicKeyTypes | None = None
+    private_key: PrivateKeyTypes | None = None
+
+    logger.info("Loading public key from %s", public_key_path)
+    # Load public key from PEM file
+    with open(public_key_path, "rb") as f:
+        public_key = serialization.load_pem_public_key(f.read())
+
+    logger.info("Loading private key from %s", private_key_path)
+    # Load private key from PEM file
+    with open(private_key_path, "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=None)
+
+    # The PEM loaders already return Ed25519 key objects, there is nothing to convert
+    if not isinstance(public_key, ed25519.Ed25519PublicKey):
+        raise ValueError(f"{public_key_path} does not contain an Ed25519 public key")
+    if not isinstance(private_key, ed25519.Ed25519PrivateKey):
+        raise ValueError(f"{private_key_path} does not contain an Ed25519 private key")
+
+    signing_key = nacl.signing.SigningKey(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+    )
+    verify_key = nacl.signing.VerifyKey(
+        public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        )
+    )
+
+    logger.info("Keys loaded successfully.")
+    return _Ed25519Keys(public_key, private_key, signing_key, verify_key)
+
 class CordguardAuth:
     """
     Cordguard Authentication Class
@@ -39,7 +111,7 @@ class CordguardAuth:
         private_key (Ed25519PrivateKey): Loaded private key instance
     """
     
-    def __init__(self, key_type: AsymmetricKeysTypes = AsymmetricKeysTypes.ED25519, private_key_path: str = f"{os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keys/server/ed25519_private_key.pem')}", public_key_path: str = f"{os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keys/server/ed25519_public_key.pem')}"):
+    def __init__(self, key_type: AsymmetricKeysTypes = AsymmetricKeysTypes.ED25519, private_key_path: str = _DEFAULT_PRIVATE_KEY_PATH, public_key_path: str = _DEFAULT_PUBLIC_KEY_PATH):
         """
         Initialize CordguardAuth with key paths and type
         
@@ -51,51 +123,37 @@ class CordguardAuth:
         self.key_type: AsymmetricKeysTypes = key_type
         self.private_key_path: str = private_key_path
         self.public_key_path: str = public_key_path
-        self.public_key: ed25519.Ed25519PublicKey | None = None
-        self.private_key: ed25519.Ed25519PrivateKey | None = None
+        self._keys: _Ed25519Keys | None = None
+        self._verified = LRUCache(maxsize=VERIFY_CACHE_SIZE, ttl=VERIFY_CACHE_TTL)
         logger.info("Initializing CordguardAuth with key type: %s", self.key_type)
         self._load_keys()
+
+    @property
+    def public_key(self) -> ed25519.Ed25519PublicKey | None:
+        """Loaded public key instance"""
+        return self._keys.public_key if self._keys else None
+
+    @property
+    def private_key(self) -> ed25519.Ed25519PrivateKey | None:
+        """Loaded private key instance"""
+        return self._keys.private_key if self._keys else None
     
     def _load_keys(self):
         """
         Load public and private keys from files into memory
         
-        Reads the key files, deserializes them from PEM format, and creates
-        Ed25519 key instances for use in cryptographic operations.
+        The instance only holds a reference to the key objects cached by _load_ed25519_keys,
+        so only the first instance for a given pair of key files pays for reading and
+        parsing them, and every instance shares the same key objects. The files'
+        modification times are part of the cache key, so replaced keys are picked up.
         """
-        public_key: PublicKeyTypes | None = None
-        private_key: PrivateKeyTypes | None = None
-        
-        logger.info("Loading public key from %s", self.public_key_path)
-        # Load public key from PEM file
-        with open(self.public_key_path, "rb") as f:
-            public_key = serialization.load_pem_public_key(f.read())
-
-        logger.info("Loading private key from %s", self.private_key_path)
-        # Load private key from PEM file
-        with open(self.private_key_path, "rb") as f:
-            private_key = serialization.load_pem_private_key(f.read(), password=None)
-
-        # Convert loaded keys to Ed25519 instances if using ED25519
         if self.key_type == AsymmetricKeysTypes.ED25519:
-            logger.info("Converting keys to Ed25519 instances.")
-            # Convert public key to raw format and create Ed25519PublicKey instance
-            self.public_key = ed25519.Ed25519PublicKey.from_public_bytes(
-                public_key.public_bytes(
-                    encoding=serialization.Encoding.Raw,
-                    format=serialization.PublicFormat.Raw
-                )
-            )
-
-            # Convert private key to raw format and create Ed25519PrivateKey instance
-            self.private_key = ed25519.Ed25519PrivateKey.from_private_bytes(
-                private_key.private_bytes(
-                    encoding=serialization.Encoding.Raw,
-                    format=serialization.PrivateFormat.Raw,
-                    encryption_algorithm=serialization.NoEncryption()
-                )
+            self._keys = _load_ed25519_keys(
+                self.private_key_path,
+                self.public_key_path,
+                os.stat(self.private_key_path).st_mtime_ns,
+                os.stat(self.public_key_path).st_mtime_ns,
             )
-            logger.info("Keys loaded and converted successfully.")
 
     def sign(self, message: bytes) -> bytes:
         """
@@ -108,7 +166,7 @@ class CordguardAuth:
             bytes: The signature for the message
         """
         logger.info("Signing message: %s", message)
-        return self.private_key.sign(message)
+        return self._keys.signing_key.sign(message).signature
 
     def verify(self, message: bytes, signature: bytes) -> bool:
         """
@@ -123,10 +181,62 @@ class CordguardAuth:
         """
         logger.info("Verifying signature for message: %s", message)
         try:
-            # Attempt to verify the signature - will raise InvalidSignature if invalid
-            self.public_key.verify(signature, message)
+            # Attempt to verify the signature - will raise BadSignatureError if invalid
+            self._keys.verify_key.verify(message, signature)
             logger.info("Signature verified successfully.")
             return True
-        except InvalidSignature:
+        except (nacl.exceptions.BadSignatureError, ValueError):
             logger.warning("Invalid signature for message: %s", message)
-            return False
\ No newline at end of file
+            return False
+    def verify_cached(self, message: bytes, signature: bytes) -> bool:
+        """
+        Verify a message signature like verify, remembering valid pairs for VERIFY_CACHE_TTL seconds
+        
+        Only successful verifications are cached, so a bad signature is always checked again.
+        
+        Args:
+            message (bytes): The original message
+            signature (bytes): The signature to verify
+            
+        Returns:
+            bool: True if signature is valid, False otherwise
+        """
+        key = (message, signature)
+        if self._verified.get(key):
+            return True
+        if not self.verify(message, signature):
+            return False
+        self._verified.set(key, True)
+        return True
+
+    async def verify_cached_async(self, message: bytes, signature: bytes) -> bool:
+        """
+        Verify a message signature like verify_cached, without blocking the event loop
+        
+        The cache is checked on the event loop; only a cache miss verifies, in a worker thread.
+        
+        Args:
+            message (bytes): The original message
+            signature (bytes): The signature to verify
+            
+        Returns:
+            bool: True if signature is valid, False otherwise
+        """
+        key = (message, signature)
+        if self._verified.get(key):
+            return True
+        if not await asyncio.to_thread(self.verify, message, signature):
+            return False
+        self._verified.set(key, True)
+        return True
+
+@cache
+def get_auth() -> CordguardAuth:
+    """
+    Return the CordguardAuth for the default server keys, shared by every request.
+
+    Created on first use; creation raises when the key files are missing, and nothing is
+    cached then, so the next call retries. The shared instance does not look at the key
+    files again, so replaced keys are picked up on restart.
+    """
+    return CordguardAuth()
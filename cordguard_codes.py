@@ -50,8 +50,6 @@ import hashlib
 import secrets
 from datetime import datetime
 import logging
-logging.basicConfig(level=logging.INFO)
-
 TIMESTAMP_HARDCODED_OFFSET = 134897
 PREFIX_ANALYSIS_ID = 'cordguard'
 
@@ -78,15 +76,15 @@ def create_trackable_id(timestamp: int = int(datetime.now().timestamp())) -> str
         >>> create_trackable_id(1633027200)
         'cordguard_a1b2c3d4e590123456_5f3e2d1c'
     """
-    logging.info(f'Starting ID creation for timestamp: {timestamp}')
+    logging.debug('Starting ID creation for timestamp: %s', timestamp)
     encoded_timestamp = hex(timestamp - TIMESTAMP_HARDCODED_OFFSET)[2:]  # Remove the '0x' prefix
-    logging.info(f'Encoded timestamp: {encoded_timestamp}')
+    logging.debug('Encoded timestamp: %s', encoded_timestamp)
     hashed_timestamp = hashlib.sha256(encoded_timestamp.encode('utf-8')).hexdigest()[:10]
-    logging.info(f'Hashed timestamp: {hashed_timestamp}')
+    logging.debug('Hashed timestamp: %s', hashed_timestamp)
     random_number = str(secrets.randbelow(90000000) + secrets.randbelow(90000000))
-    logging.info(f'Random number: {random_number}')
+    logging.debug('Random number: %s', random_number)
     full_analysis_id = hashed_timestamp + random_number + '_' + encoded_timestamp
-    logging.info(f'Full analysis ID: {full_analysis_id}')
+    logging.debug('Full analysis ID: %s', full_analysis_id)
     return PREFIX_ANALYSIS_ID + '_' + full_analysis_id
 
 def extract_timestamp_from_trackable_id(trackable_id: str) -> datetime:
@@ -112,17 +110,17 @@ def extract_timestamp_from_trackable_id(trackable_id: str) -> datetime:
         >>> extract_timestamp_from_trackable_id('cordguard_a1b2c3d4e590123456_5f3e2d1c')
         datetime(2021, 10, 1, 0, 0, 0)
     """
-    logging.info(f'Extracting timestamp from trackable ID: {trackable_id}')
+    logging.debug('Extracting timestamp from trackable ID: %s', trackable_id)
     trackable_id_parts = trackable_id.split('_')
     if len(trackable_id_parts) != 3:
         logging.error("Invalid trackable ID format")
         raise ValueError("Invalid trackable ID format")
     
     timestamp_hex = trackable_id_parts[2]
-    logging.info(f'Timestamp hex: {timestamp_hex}')
+    logging.debug('Timestamp hex: %s', timestamp_hex)
     # Convert hex directly to integer
     timestamp_int = int(timestamp_hex, 16)
-    logging.info(f'Timestamp int: {timestamp_int}')
+    logging.debug('Timestamp int: %s', timestamp_int)
     result_datetime = datetime.fromtimestamp(timestamp_int + TIMESTAMP_HARDCODED_OFFSET)
-    logging.info(f'Converted datetime: {result_datetime}')
+    logging.debug('Converted datetime: %s', result_datetime)
     return result_datetime
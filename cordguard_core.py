@@ -12,6 +12,8 @@ CordGuard system, handling application setup and file analysis workflows.
 
 Key Components:
     - FastAPI application initialization
+    - Request id propagation for log correlation
+    - Request body size limit enforced from Content-Length
     - Database connection management
     - Asynchronous queue consumer
     - File analysis orchestration
@@ -23,35 +25,131 @@ Version: 1.0.0
 """
 
 import logging
+import secrets
+import orjson
+from contextvars import ContextVar
 from fastapi import FastAPI, APIRouter
+from cordguard_utils import MAX_FILE_SIZE
 
 # from cordguard_analysis import static_analysis !Deprecated
 logger = logging.getLogger(__name__)
 
 STATIC_ANALYSIS_QUEUE_FLAG = True
 
-def init_fastapi_app(app: FastAPI, routers: list[APIRouter]):
+# Correlation id of the request being served, '-' outside of a request
+request_id_var: ContextVar[str] = ContextVar('request_id', default='-')
+
+# Incoming X-Request-ID values longer than this are replaced with a generated id
+REQUEST_ID_MAX_LENGTH = 64
+
+# Largest request body accepted: the largest sample plus room for the multipart framing around it
+MAX_REQUEST_BODY_SIZE = MAX_FILE_SIZE + 1024 * 1024
+
+class RequestIdFilter(logging.Filter):
+    """
+    Logging filter that stamps every record with the current request id.
+
+    Attach it to handlers (not loggers) so records from every module pick it up,
+    then reference it in the format string as %(request_id)s.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that binds a request id to the request's context.
+
+    Reuses the caller's X-Request-ID header when present and sane, otherwise generates one,
+    and echoes it back on the response so client and server logs can be correlated.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] not in ('http', 'websocket'):
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope['headers']:
+            if name == b'x-request-id':
+                if 0 < len(value) <= REQUEST_ID_MAX_LENGTH and value.isascii():
+                    request_id = value.decode()
+                break
+        if request_id is None:
+            request_id = secrets.token_hex(8)
+        encoded_request_id = request_id.encode()
+
+        async def send_with_request_id(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = [*message.get('headers', ()), (b'x-request-id', encoded_request_id)]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware that rejects requests whose declared Content-Length is too large.
+
+    The check runs on the headers alone, before any of the body is received or parsed, so an
+    oversized upload is refused without being spooled. Bodies without a Content-Length
+    (chunked) still go through the size checks of the endpoints themselves.
+    """
+    def __init__(self, app, max_body_size: int = MAX_REQUEST_BODY_SIZE):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            for name, value in scope['headers']:
+                if name == b'content-length':
+                    if value.isdigit() and int(value) > self.max_body_size:
+                        logger.warning('Rejected request body of %s bytes for %s', value.decode(), scope['path'])
+                        body = orjson.dumps({'detail': 'Request body too large'})
+                        await send({
+                            'type': 'http.response.start',
+                            'status': 413,
+                            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                                        (b'connection', b'close')]
+                        })
+                        await send({'type': 'http.response.body', 'body': body})
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+def init_fastapi_app(routers: list[APIRouter], **fastapi_kwargs) -> FastAPI:
     """
     Create and configure FastAPI application.
     
     This function initializes the FastAPI application by:
+    - Creating the single FastAPI instance from the given keyword arguments
+    - Installing the request id middleware used for log correlation
+    - Installing the body size limit, so oversized uploads are refused from their headers
     - Including API routers for analysis and discovery service endpoints
-    - Setting up middleware and configurations
     
     Args:
-        app (FastAPI): The FastAPI application instance to configure
         routers (list[APIRouter]): List of FastAPI routers to include
+        **fastapi_kwargs: Passed to FastAPI() (title, description, version, ...)
     
     Returns:
         FastAPI: Configured FastAPI application instance
     """
     logger.info("Initializing FastAPI application with routers.")
+    app = FastAPI(**fastapi_kwargs)
+    app.add_middleware(BodySizeLimitMiddleware)
+    app.add_middleware(RequestIdMiddleware)
 
     # Include routers
+    log_routes = logger.isEnabledFor(logging.INFO)
     for router in routers:
-        logger.info(f"Including router {router.prefix} with routes:")
-        for route in router.routes:
-            logger.info(f"  - {route.path} [{route.methods}]")
+        if log_routes:
+            logger.info("Including router %s with routes: %s", router.prefix, orjson.dumps(
+                [(route.path, sorted(getattr(route, 'methods', None) or ())) for route in router.routes]
+            ).decode())
         app.include_router(router)
         
     logger.info("FastAPI application initialized successfully.")
@@ -37,13 +37,16 @@ Dependencies:
 - cordguard_codes: ID generation utilities
 - datetime: Timestamp handling
 - logging: Application logging
-- re: Regular expressions for input sanitization
-- json: JSON data handling
+- string: Character classes for input sanitization
+- orjson: JSON encoding for the SurrealDB websocket client
 
 Usage:
 -----
     # Create database instance
     db = await CordGuardDatabase.create()
+
+    # Or, inside a FastAPI route, use the shared pooled instance
+    async def route(db: CordGuardDatabase = Depends(get_db)): ...
     
     # Create new analysis
     analysis = await db.new_analysis_for_file(file)
@@ -64,6 +67,10 @@ Version: 1.0.0
 """
 
 from surrealdb import Surreal
+from surrealdb.ws import SurrealException
+import surrealdb.ws
+import importlib.metadata
+import orjson
 from cordguard_file import CordGuardAnalysisFile
 from datetime import datetime
 import logging
@@ -72,11 +79,16 @@ from cordguard_worker_mission import CordguardWorkerMission
 from cordguard_worker import CordguardWorkerStatus
 from cordguard_result import CordguardResult
 from cordguard_codes import create_trackable_id
-import re
+import string
 from cordguard_ai import OpenAIResponse
+from cordguard_utils import LRUCache
+import cordguard_globals  # noqa: F401 - loads .env before the connection settings below are read
+import asyncio
 import os
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from collections import deque
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
 
 class CordGuardAnalysisStatus:
     """
@@ -151,6 +163,9 @@ class CordGuardFileRecord:
     Data model representing a file record in the database.
     Contains file metadata and references.
     """
+    __slots__ = ('id', 'file_hash', 'analysis_id', 'file_id', 'file_name', 'file_type',
+                 'file_size', 'file_extension', 'file_full_url')
+
     def __init__(self, 
                  id: str, 
                  file_hash: str, 
@@ -174,24 +189,24 @@ class CordGuardFileRecord:
     def get_dict(self) -> dict:
         """Convert record to dictionary format for database storage"""
         return {
-            f"{CordGuardFileRecordFields.id}": self.id,
-            f"{CordGuardFileRecordFields.file_hash}": self.file_hash,
-            f"{CordGuardFileRecordFields.file_name}": self.file_name,
-            f"{CordGuardFileRecordFields.file_full_url}": self.file_full_url,
-            f"{CordGuardFileRecordFields.file_extension}": self.file_extension,
-            f"{CordGuardFileRecordFields.file_size}": self.file_size,
-            f"{CordGuardFileRecordFields.file_type}": self.file_type,
-            f"{CordGuardFileRecordFields.analysis_id}": self.analysis_id
+            CordGuardFileRecordFields.id: self.id,
+            CordGuardFileRecordFields.file_hash: self.file_hash,
+            CordGuardFileRecordFields.file_name: self.file_name,
+            CordGuardFileRecordFields.file_full_url: self.file_full_url,
+            CordGuardFileRecordFields.file_extension: self.file_extension,
+            CordGuardFileRecordFields.file_size: self.file_size,
+            CordGuardFileRecordFields.file_type: self.file_type,
+            CordGuardFileRecordFields.analysis_id: self.analysis_id
         }
 
     def get_safe_dict(self) -> dict:
         """Convert record to dictionary format for database storage, without the id and confidential data"""
         return {
-            f"{CordGuardFileRecordFields.file_hash}": self.file_hash,
-            f"{CordGuardFileRecordFields.file_name}": self.file_name,
-            f"{CordGuardFileRecordFields.file_extension}": self.file_extension,
-            f"{CordGuardFileRecordFields.file_size}": self.file_size,
-            f"{CordGuardFileRecordFields.file_type}": self.file_type,
+            CordGuardFileRecordFields.file_hash: self.file_hash,
+            CordGuardFileRecordFields.file_name: self.file_name,
+            CordGuardFileRecordFields.file_extension: self.file_extension,
+            CordGuardFileRecordFields.file_size: self.file_size,
+            CordGuardFileRecordFields.file_type: self.file_type,
         }
 
 class CordGuardAnalysisRecord:
@@ -199,6 +214,12 @@ class CordGuardAnalysisRecord:
     Data model representing an analysis record in the database.
     Tracks the status and progress of file analysis.
     """
+    __slots__ = ('id', 'analysis_id', 'status', 'file', 'file_hash', 'percent_complete',
+                 'created_at', '_updated_at', '_updated_at_str')
+
+    # Record ids come back from SurrealDB as "analysis:<id>"
+    _ID_PREFIX = CordGuardTableMetadata.ANALYSIS_NAME + ':'
+
     def __init__(self, 
                  id: str,
                  status: str, 
@@ -208,7 +229,7 @@ class CordGuardAnalysisRecord:
                  created_at: datetime,
                  updated_at: datetime,
                  analysis_id: str = ""):
-        self.id = id.removeprefix(CordGuardTableMetadata.ANALYSIS_NAME + ':') if id else ""
+        self.id = id.removeprefix(self._ID_PREFIX) if id else ""
         self.analysis_id = analysis_id if analysis_id else self.id
         self.status = status
         self.file = file
@@ -217,16 +238,245 @@ class CordGuardAnalysisRecord:
         self.created_at = created_at
         self.updated_at = updated_at
 
+    @property
+    def updated_at(self) -> datetime:
+        return self._updated_at
+
+    @updated_at.setter
+    def updated_at(self, value: datetime):
+        # Stringified once here rather than on every get_dict()
+        self._updated_at = value
+        self._updated_at_str = str(value)
+
     def get_dict(self) -> dict:
         """Convert record to dictionary format for database storage"""
         return {
-            f"{CordGuardAnalysisRecordFields.status}": self.status,
-            f"{CordGuardAnalysisRecordFields.percent_complete}": self.percent_complete,
-            f"{CordGuardAnalysisRecordFields.created_at}": str(self.created_at),
-            f"{CordGuardAnalysisRecordFields.updated_at}": str(self.updated_at),
-            f"{CordGuardAnalysisRecordFields.file_hash}": f"{self.file_hash}", # it will be file:hash_here
+            CordGuardAnalysisRecordFields.status: self.status,
+            CordGuardAnalysisRecordFields.percent_complete: self.percent_complete,
+            CordGuardAnalysisRecordFields.created_at: str(self.created_at),
+            CordGuardAnalysisRecordFields.updated_at: self._updated_at_str,
+            CordGuardAnalysisRecordFields.file_hash: self.file_hash, # it will be file:hash_here
         }
 
+class _OrjsonSurreal(Surreal):
+    """
+    Surreal client whose websocket frames are encoded and decoded with orjson instead of json.
+
+    Overrides the client's private _send and _recv, as written in surrealdb 0.3.x; frames are
+    still sent as text, as the stock client sends them. Only connections opened by
+    CordGuardDatabase use it, the surrealdb module itself is left untouched.
+    """
+    async def _send(self, request: surrealdb.ws.Request) -> None:
+        self._validate_connection()
+        await self.ws.send(orjson.dumps(request.dict(), option=orjson.OPT_NON_STR_KEYS).decode())
+
+    async def _recv(self) -> surrealdb.ws.ResponseSuccess | surrealdb.ws.ResponseError:
+        self._validate_connection()
+        response = orjson.loads(await self.ws.recv())
+        if response.get("error"):
+            return surrealdb.ws.ResponseError(**response["error"])
+        return surrealdb.ws.ResponseSuccess(**response)
+
+def _surreal_client_version() -> str:
+    try:
+        return importlib.metadata.version('surrealdb')
+    except importlib.metadata.PackageNotFoundError:
+        return ''
+
+# The overrides only match the client version they were written against; any other gets the stock client
+SURREAL_CLIENT_VERSION = _surreal_client_version()
+_ENCODES_WITH_ORJSON = SURREAL_CLIENT_VERSION.startswith('0.3.') and all(
+    callable(getattr(Surreal, name, None)) for name in ('_send', '_recv', '_validate_connection')
+)
+_SurrealClient = _OrjsonSurreal if _ENCODES_WITH_ORJSON else Surreal
+# With orjson encoding the frames, dataclass parameters are serialized as they are, without a dict copy
+_ENCODES_DATACLASSES = _ENCODES_WITH_ORJSON
+
+# Parsed records keyed by (table, id), shared by every CordGuardDatabase of the process.
+# Analysis and worker rows change under other processes too, so they only live briefly;
+# file rows are content addressed and never updated, so they are kept longer.
+# Worker rows only change when a mission is assigned or finished, which updates or drops
+# the cached worker, so polling workers are looked up a few times a minute at most. Those
+# updates only reach the cache of the process making them: a cached worker's acquired flag
+# can be stale for up to WORKER_RECORD_CACHE_TTL, so it is never used to decide on an
+# assignment; assign_pending_analysis reads the stored flag and refreshes the cached one.
+RECORD_CACHE_TTL = 5
+WORKER_RECORD_CACHE_TTL = 15
+FILE_RECORD_CACHE_TTL = 300
+_record_cache = LRUCache(maxsize=1024, ttl=RECORD_CACHE_TTL)
+
+# Connection settings, read once at import (cordguard_globals has loaded .env by then)
+SURREALDB_URL = os.getenv('SURREALDB_URL')
+SURREALDB_USERNAME = os.getenv('SURREALDB_USERNAME')
+SURREALDB_PASSWORD = os.getenv('SURREALDB_PASSWORD')
+_SURREALDB_CREDENTIALS = {'user': SURREALDB_USERNAME, 'pass': SURREALDB_PASSWORD}
+
+_DEFINE_TABLES_QUERY = '\n'.join(f'DEFINE TABLE IF NOT EXISTS {table} SCHEMALESS;' for table in (
+    CordGuardTableMetadata.FILE_NAME,
+    CordGuardTableMetadata.ANALYSIS_NAME,
+    CordGuardTableMetadata.WORKERS_NAME,
+    CordGuardTableMetadata.MISSIONS_NAME,
+    CordGuardTableMetadata.RESULTS_NAME,
+    CordGuardTableMetadata.WAITLIST_NAME,
+    CordGuardTableMetadata.AI_RESPONSES_NAME,
+)) + (
+    # Workers, missions, files and results are looked up by record id, which needs no index;
+    # the pending analysis scans filter on status, so it is indexed to stay off a table scan
+    f'\nDEFINE INDEX IF NOT EXISTS analysis_status_idx ON TABLE {CordGuardTableMetadata.ANALYSIS_NAME} FIELDS status;'
+)
+
+# Raw queries are constant texts with $-parameters, so the server sees the same statement every call
+_CREATE_RECORD_QUERY = "CREATE type::thing($table, $id) CONTENT $data"
+_SELECT_RECORD_QUERY = "SELECT * FROM type::thing($table, $id)"
+_UPDATE_RECORD_QUERY = "UPDATE type::thing($table, $id) CONTENT $data"
+
+# The analysis' file_hash is stored as a "files:<hash>" string, not as a record link
+_PENDING_ANALYSIS_QUERY = """
+LET $analysis = (SELECT *, meta::id(id) AS analysis_id FROM type::table($analysis_table) WHERE status = $status LIMIT 1)[0];
+LET $file = IF $analysis THEN (SELECT * FROM type::thing($file_table, array::last(string::split($analysis.file_hash, ':'))))[0] END;
+RETURN { analysis: $analysis, file: $file };
+"""
+
+_UPDATE_ANALYSIS_STATUS_QUERY = """
+UPDATE type::thing($analysis_table, $analysis_id) MERGE { status: $status, updated_at: $updated_at } RETURN AFTER;
+"""
+
+# Hands the first pending analysis to a free worker: marks the analysis as analyzing, the worker as
+# acquired and replaces the worker's mission, all or nothing. Every write is skipped when no
+# analysis is pending, or when the stored worker is already acquired; the RETURN then holds the
+# worker's current mission, so concurrent or retried requests of one worker never take a second analysis.
+_ASSIGN_PENDING_ANALYSIS_QUERY = """
+BEGIN TRANSACTION;
+LET $busy = ((SELECT is_acquired FROM type::thing($workers_table, $worker_id))[0].is_acquired == true);
+LET $existing = IF $busy THEN (SELECT * FROM type::thing($missions_table, $mission_worker_id))[0] END;
+LET $analysis = IF !$busy THEN (SELECT * FROM type::table($analysis_table) WHERE status = $pending LIMIT 1)[0] END;
+LET $file = IF $analysis THEN (SELECT * FROM type::thing($file_table, array::last(string::split($analysis.file_hash, ':'))))[0] END;
+IF $analysis AND !$file THEN THROW "File record not found for pending analysis" END;
+LET $assigned = IF $analysis THEN (UPDATE type::thing($analysis_table, meta::id($analysis.id)) MERGE { status: $analyzing, updated_at: $updated_at } RETURN AFTER)[0] END;
+IF $analysis THEN (UPDATE type::thing($workers_table, $worker_id) CONTENT $worker) END;
+IF $analysis THEN (DELETE type::thing($missions_table, $mission_worker_id)) END;
+LET $mission = IF $analysis THEN (CREATE type::thing($missions_table, $mission_worker_id) CONTENT {
+    mission_id: $mission_id,
+    worker: $worker,
+    analysis: $assigned,
+    file: $file
+})[0] END;
+RETURN {
+    acquired: $busy,
+    mission: IF $busy THEN $existing ELSE $mission END,
+    analysis_id: IF $analysis THEN meta::id($analysis.id) ELSE IF $existing THEN meta::id($existing.analysis.id) END
+};
+COMMIT TRANSACTION;
+"""
+
+# Stores a mission's result: sets the analysis' final status, releases the worker and creates the
+# result record, all or nothing, and only when both the analysis and the worker exist
+_SAVE_MISSION_RESULT_QUERY = """
+BEGIN TRANSACTION;
+LET $analysis = (SELECT id FROM type::thing($analysis_table, $analysis_id))[0];
+LET $worker = (SELECT id FROM type::thing($workers_table, $worker_id))[0];
+IF $analysis AND $worker THEN (UPDATE type::thing($analysis_table, $analysis_id) MERGE { status: $status, updated_at: $updated_at }) END;
+IF $analysis AND $worker THEN (UPDATE type::thing($workers_table, $worker_id) MERGE { is_acquired: false }) END;
+IF $analysis AND $worker THEN (CREATE type::thing($results_table, $result_id) CONTENT { result_data: $result_data, created_at: $updated_at }) END;
+RETURN { analysis: $analysis.id, worker: $worker.id };
+COMMIT TRANSACTION;
+"""
+
+# Creates the worker unless a record with its id exists; returns the record that existed before, if any
+_UPSERT_WORKER_QUERY = """
+BEGIN TRANSACTION;
+LET $existing = (SELECT * FROM type::thing($table, $id))[0];
+IF !$existing THEN (CREATE type::thing($table, $id) CONTENT $data) END;
+RETURN $existing;
+COMMIT TRANSACTION;
+"""
+
+# An analysis and the file it points to
+_ANALYSIS_WITH_FILE_QUERY = """
+LET $analysis = (SELECT * FROM type::thing($analysis_table, $analysis_id))[0];
+LET $file = IF $analysis THEN (SELECT * FROM type::thing($file_table, array::last(string::split($analysis.file_hash, ':'))))[0] END;
+RETURN { analysis: $analysis, file: $file };
+"""
+
+# Concurrent analysis lookups arriving within this many seconds of each other share one round
+# trip (see load_analysis_record), with at most ANALYSIS_BATCH_MAX_SIZE analyses per batch
+ANALYSIS_BATCH_WINDOW = 0.002
+ANALYSIS_BATCH_MAX_SIZE = 100
+
+# A file and, when the file exists, the analysis its analysis_id points to
+_FILE_WITH_ANALYSIS_QUERY = """
+LET $file = (SELECT * FROM type::thing($file_table, $file_hash))[0];
+LET $analysis = IF $file THEN (SELECT * FROM type::thing($analysis_table, $file.analysis_id))[0] END;
+RETURN { file: $file, analysis: $analysis };
+"""
+
+# A new file together with its first analysis, both or neither
+_CREATE_FILE_WITH_ANALYSIS_QUERY = """
+BEGIN TRANSACTION;
+CREATE type::thing($file_table, $file_hash) CONTENT $file;
+CREATE type::thing($analysis_table, $analysis_id) CONTENT $analysis;
+COMMIT TRANSACTION;
+"""
+
+class _BatchLoader:
+    """
+    Coalesce concurrent lookups by key into batched calls, DataLoader style.
+
+    The first load() of a batch schedules a flush after `window` seconds; every key requested
+    until then (or until max_size keys are pending) is fetched by a single load_many() call,
+    and all the waiters of a key share its result.
+
+    Attributes:
+        load_many: Coroutine function taking a list of keys and returning a dict of key to value
+        window (float): Seconds to wait for more keys before flushing
+        max_size (int): Number of pending keys that triggers an immediate flush
+    """
+
+    def __init__(self, load_many, window: float, max_size: int):
+        self.load_many = load_many
+        self.window = window
+        self.max_size = max_size
+        self._pending: dict = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # Strong references to the running batches, the event loop only keeps weak ones
+        self._batches: set[asyncio.Task] = set()
+
+    async def load(self, key):
+        """Return the value for key once its batch has been fetched; missing keys give None."""
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+        # Shielded: a cancelled waiter must not cancel the result other waiters share
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: dict):
+        try:
+            values = await self.load_many(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Marks the exception as retrieved when every waiter has gone
+                    future.exception()
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
 class CordGuardDatabase:
     """
     CordGuardDatabase class for interacting with the database.
@@ -235,105 +485,257 @@ class CordGuardDatabase:
     This class provides an interface to interact with a SurrealDB database for storing
     and managing analysis records. It uses an async factory pattern for initialization.
 
+    The SurrealDB websocket client pairs responses with requests by order, so one connection
+    can only serve one call at a time. Each instance therefore keeps a small pool of
+    connections, opened on demand up to pool_size, and every call borrows one through
+    _acquire() so concurrent coroutines run their queries side by side.
+
     Attributes:
-        surreal_db: The SurrealDB client connection instance
+        pool_size: Maximum number of connections this instance opens
 
     Example:
         >>> db = await CordGuardDatabase.create()
         >>> analysis = await db.new_analysis_for_file(file)
         >>> status = await db.update_analysis_record_status_by_analysis_id(id, new_status)
     """
-    def __init__(self):
+    # Set once the tables have been defined by any connection of this process
+    _tables_defined = False
+
+    def __init__(self, pool_size: int = 1):
         """Initialize an empty database instance. Use create() instead of calling directly."""
-        self.surreal_db: Surreal | None = None
+        self.pool_size = pool_size
+        self._idle_connections: deque[Surreal] = deque()
+        self._connection_slots = asyncio.Semaphore(pool_size)
+        self._analysis_loader = _BatchLoader(self.get_many_analysis_records, ANALYSIS_BATCH_WINDOW, ANALYSIS_BATCH_MAX_SIZE)
+
+    # Deletes every ASCII character except letters, digits, underscores and hyphens
+    _SANITIZE_TABLE = str.maketrans('', '', ''.join(
+        chr(c) for c in range(128) if chr(c) not in string.ascii_letters + string.digits + '_-'
+    ))
 
     def _sanitize_input(self, value: str) -> str:
         """Sanitize input to prevent SQL injection"""
         if not isinstance(value, str):
             return value
+        if not value.isascii():
+            # Non-ASCII characters are never allowed, drop them before the ASCII table applies
+            value = value.encode('ascii', 'ignore').decode('ascii')
         # Remove any non-alphanumeric characters except underscores and hyphens
-        return re.sub(r'[^a-zA-Z0-9_\-]', '', value)
+        return value.translate(self._SANITIZE_TABLE)
 
     @classmethod
-    async def create(cls) -> 'CordGuardDatabase':
+    async def create(cls, pool_size: int = 1) -> 'CordGuardDatabase':
         """Factory method to create and initialize the database connection
         
+        The first connection is opened right away so a misconfigured database fails here;
+        the others are opened the first time concurrent calls need them.
+
+        Args:
+            pool_size (int): Maximum number of connections the instance may open
+
         Returns:
             CordGuardDatabase: A new database instance with an initialized connection
 
         Raises:
             Exception: If database connection or initialization fails
         """
-        db = cls()
-        await db._init_surreal_db()
-        logging.info("Database instance created and initialized.")
+        db = cls(pool_size)
+        db._idle_connections.append(await db._init_surreal_db())
+        logger.info("Database instance created and initialized.")
         return db
     
     @classmethod
     async def test_connection(cls) -> bool:
         """Test the database connection"""
         db = cls()
-        await db._init_surreal_db()
-        logging.info("Database connection tested successfully.")
+        await cls._close_connection(await db._init_surreal_db())
+        logger.info("Database connection tested successfully.")
         return True
 
-    async def _init_surreal_db(self):
-        """Initialize the SurrealDB connection and authenticate
+    @staticmethod
+    def _is_open(connection: Surreal) -> bool:
+        """Whether a connection's websocket is open"""
+        return connection.ws is not None and not getattr(connection.ws, 'closed', False)
+
+    @staticmethod
+    async def _close_connection(connection: Surreal):
+        """Close a connection, ignoring errors from an already broken socket"""
+        if connection.ws is None:
+            return
+        try:
+            await connection.close()
+        except Exception as e:
+            logger.warning('Error closing SurrealDB connection: %s', e)
+
+    async def close(self):
+        """Close the idle connections of the pool"""
+        while self._idle_connections:
+            await self._close_connection(self._idle_connections.pop())
+
+    @asynccontextmanager
+    async def _acquire(self):
+        """
+        Borrow a connection from the pool for the duration of one call.
+
+        Reuses an idle connection when there is one, opens a new one while fewer than
+        pool_size are in use, and waits otherwise. A call that failed before reading its reply
+        or was cancelled may have left that reply on the socket, so its connection is closed
+        instead of being returned to the pool.
+        """
+        async with self._connection_slots:
+            connection = None
+            while self._idle_connections:
+                connection = self._idle_connections.pop()
+                if self._is_open(connection):
+                    break
+                connection = None
+            if connection is None:
+                connection = await self._init_surreal_db()
+            try:
+                yield connection
+            except SurrealException:
+                # An error reply from the server: the exchange completed, the socket is in sync
+                self._idle_connections.append(connection)
+                raise
+            except BaseException:
+                await self._close_connection(connection)
+                raise
+            self._idle_connections.append(connection)
+
+    async def _init_surreal_db(self) -> Surreal:
+        """Open a new SurrealDB connection and authenticate
         
         Sets up the websocket connection to SurrealDB, authenticates with root credentials,
         and selects the cordguard namespace and database.
         
+        Returns:
+            Surreal: The connected client
+
         Raises:
             Exception: If connection, authentication or database selection fails
         """
-        SURREALDB_URL = os.getenv('SURREALDB_URL')
-        self.surreal_db = Surreal(SURREALDB_URL)
-
-        logging.info(f'Initializing SurrealDB connection at {SURREALDB_URL}')
-        await self.surreal_db.connect()
-        SURREALDB_USERNAME = os.getenv('SURREALDB_USERNAME')
-        SURREALDB_PASSWORD = os.getenv('SURREALDB_PASSWORD')
         if SURREALDB_USERNAME is None or SURREALDB_PASSWORD is None:
-            logging.error('SurrealDB credentials not found')
+            logger.error('SurrealDB credentials not found')
             raise Exception('SurrealDB credentials not found')
-        await self.surreal_db.signin({'user': SURREALDB_USERNAME, 'pass': SURREALDB_PASSWORD})
-        await self.surreal_db.use('cordguard', 'guard')
+        surreal_db = _SurrealClient(SURREALDB_URL)
 
-        # Try to create tables if they don't exist
-        try:
-            await self.surreal_db.query(f"""
-                DEFINE TABLE {CordGuardTableMetadata.FILE_NAME};
-                DEFINE TABLE {CordGuardTableMetadata.ANALYSIS_NAME};
-                DEFINE TABLE {CordGuardTableMetadata.WORKERS_NAME};
-                DEFINE TABLE {CordGuardTableMetadata.MISSIONS_NAME};
-                DEFINE TABLE {CordGuardTableMetadata.RESULTS_NAME};
-                DEFINE TABLE {CordGuardTableMetadata.WAITLIST_NAME};
-                DEFINE TABLE {CordGuardTableMetadata.AI_RESPONSES_NAME};
-            """)
-            logging.info('Database initialized with tables successfully.')
-        except Exception as e:
-            logging.warning(f"Tables may already exist: {e}")
-            pass
+        logger.info('Initializing SurrealDB connection at %s', SURREALDB_URL)
+        await surreal_db.connect()
+        await surreal_db.signin(_SURREALDB_CREDENTIALS)
+        await surreal_db.use('cordguard', 'guard')
+
+        # Create tables and indexes if they don't exist, once per process rather than per connection
+        if not CordGuardDatabase._tables_defined:
+            try:
+                self._query_results(await surreal_db.query(_DEFINE_TABLES_QUERY))
+            except BaseException:
+                await self._close_connection(surreal_db)
+                raise
+            CordGuardDatabase._tables_defined = True
+            logger.info('Database initialized with tables successfully.')
             
-        logging.info('SurrealDB initialized')
+        logger.info('SurrealDB initialized')
+        return surreal_db
     
+    @staticmethod
+    def _query_results(response: list[dict]) -> list:
+        """
+        Unwrap the per-statement results of a query() response
+
+        Raises:
+            SurrealException: If any statement failed (in a transaction, all of them fail)
+        """
+        results = []
+        for statement in response:
+            if statement.get('status') != 'OK':
+                raise SurrealException(f"Query failed: {statement.get('result') or statement.get('detail')}")
+            results.append(statement.get('result'))
+        return results
+
+    @staticmethod
+    def _analysis_record_from_dict(record: dict, file_record: CordGuardFileRecord | None, analysis_id: str) -> CordGuardAnalysisRecord:
+        """Build an analysis record from its database row"""
+        created_at = record.get('created_at')
+        updated_at = record.get('updated_at')
+        if created_at is None or updated_at is None:
+            now = datetime.now()
+            created_at = now if created_at is None else created_at
+            updated_at = now if updated_at is None else updated_at
+        return CordGuardAnalysisRecord(
+            id=record.get('id', ''),
+            status=record.get('status', ''),
+            file=file_record,
+            file_hash=record.get('file_hash', ''),
+            percent_complete=record.get('percent_complete', 0),
+            created_at=created_at,
+            updated_at=updated_at,
+            analysis_id=analysis_id
+        )
+
+    @staticmethod
+    def _worker_from_dict(record: dict) -> CordguardWorker:
+        """Build a worker from its database row"""
+        # Clean up internal DB fields before creating worker object
+        worker_data = record.copy()
+        is_acquired = worker_data.pop('is_acquired', False)
+        worker_data.pop('id', None)
+
+        # Set status based on acquisition state
+        status = (CordguardWorkerStatus.ACQUIRED if is_acquired
+                 else CordguardWorkerStatus.NOT_ACQUIRED)
+        return CordguardWorker(**worker_data, status=status)
+
+    @staticmethod
+    def _file_record_from_dict(record: dict) -> CordGuardFileRecord:
+        """Build a file record from its database row and cache it"""
+        file_record = CordGuardFileRecord(**record)
+        _record_cache.set((CordGuardTableMetadata.FILE_NAME, file_record.file_hash), file_record, ttl=FILE_RECORD_CACHE_TTL)
+        return file_record
+
+    async def _create_record(self, table: str, record_id: str, data: dict) -> dict | None:
+        """CREATE a record, its table and id bound as parameters rather than formatted into a thing string"""
+        async with self._acquire() as conn:
+            response = await conn.query(_CREATE_RECORD_QUERY, {'table': table, 'id': record_id, 'data': data})
+        records = self._query_results(response)[-1]
+        return records[0] if records else None
+
+    async def _select_record(self, table: str, record_id: str) -> dict | None:
+        """SELECT a record by table and id"""
+        async with self._acquire() as conn:
+            response = await conn.query(_SELECT_RECORD_QUERY, {'table': table, 'id': record_id})
+        records = self._query_results(response)[-1]
+        return records[0] if records else None
+
+    async def _update_record(self, table: str, record_id: str, data: dict) -> dict | None:
+        """Replace the content of a record by table and id"""
+        async with self._acquire() as conn:
+            response = await conn.query(_UPDATE_RECORD_QUERY, {'table': table, 'id': record_id, 'data': data})
+        records = self._query_results(response)[-1]
+        return records[0] if records else None
+
     async def create_file_record(self, file: CordGuardAnalysisFile) -> CordGuardFileRecord | None:
         sanitized_hash = self._sanitize_input(file.file_hash)
-        record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.FILE_NAME}:{sanitized_hash}', 
-            file.get_dict()
-        )
-        logging.info(f'File record created for hash: {sanitized_hash}')
+        _record_cache.pop((CordGuardTableMetadata.FILE_NAME, sanitized_hash))
+        record = await self._create_record(CordGuardTableMetadata.FILE_NAME, sanitized_hash, file.get_dict())
+        logger.info('File record created for hash: %s', sanitized_hash)
         return CordGuardFileRecord(**record) if record else None
 
     async def get_file_record_by_file_hash(self, file_hash: str) -> CordGuardFileRecord | None:
-        if ':' in file_hash:
-            file_hash = file_hash.split(':')[1]
-        record = await self.surreal_db.select(
-            f'{CordGuardTableMetadata.FILE_NAME}:{file_hash}'
-        )   
-        logging.info(f'File record retrieved for hash: {file_hash}')
-        return CordGuardFileRecord(**record) if record else None
+        # Accept both a bare hash and a "files:<hash>" record id
+        _, separator, bare_hash = file_hash.partition(':')
+        if separator:
+            file_hash = bare_hash
+        cache_key = (CordGuardTableMetadata.FILE_NAME, file_hash)
+        cached = _record_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        record = await self._select_record(CordGuardTableMetadata.FILE_NAME, file_hash)
+        logger.info('File record retrieved for hash: %s', file_hash)
+        if not record:
+            return None
+        file_record = CordGuardFileRecord(**record)
+        _record_cache.set(cache_key, file_record, ttl=FILE_RECORD_CACHE_TTL)
+        return file_record
 
     async def new_analysis_for_file(self, cordguard_file: CordGuardAnalysisFile) -> CordGuardAnalysisRecord | None:
         """
@@ -360,48 +762,76 @@ class CordGuardDatabase:
             'pending'
         """
 
-        # Check if the file already exists in the database
-        file_record = await self.get_file_record_by_file_hash(cordguard_file.file_hash)
-        if file_record:
+        # Fetch the file and its analysis, if any, in a single round trip
+        async with self._acquire() as conn:
+            response = await conn.query(_FILE_WITH_ANALYSIS_QUERY, {
+                'file_table': CordGuardTableMetadata.FILE_NAME,
+                'file_hash': self._sanitize_input(cordguard_file.file_hash),
+                'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+            })
+        existing = self._query_results(response)[-1] or {}
 
+        # A new record is created and updated at the same instant
+        now_str = str(datetime.now())
+
+        if existing.get('file'):
+            file_record = CordGuardFileRecord(**existing['file'])
             # Change the file object to the file record from the database
             cordguard_file = file_record
 
-            logging.info(f'File already exists in the database: {cordguard_file.file_hash}')
-            # Get the analysis_id from the file record
-            analysis_record = await self.get_analysis_record_by_analysis_id(file_record.analysis_id, file_record)
-            if analysis_record:
-                logging.info(f'The file exists, and has an analysis record already.')
-                return analysis_record
-            logging.info(f'The file exists, but there is no analysis process for it')
-            logging.info(f'Creating new analysis record for file: {cordguard_file.file_hash}')
+            logger.info('File already exists in the database: %s', cordguard_file.file_hash)
+            if existing.get('analysis'):
+                logger.info('The file exists, and has an analysis record already.')
+                return self._analysis_record_from_dict(existing['analysis'], file_record, file_record.analysis_id)
+            logger.info('The file exists, but there is no analysis process for it')
+            logger.info('Creating new analysis record for file: %s', cordguard_file.file_hash)
+
+            sanitized_analysis_id = self._sanitize_input(cordguard_file.analysis_id)
+            sanitized_file_hash = self._sanitize_input(file_record.file_hash)
+            analysis_record = await self._create_record(
+                CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id,
+                {
+                    CordGuardAnalysisRecordFields.status:               CordGuardAnalysisStatus.PENDING,
+                    CordGuardAnalysisRecordFields.percent_complete:     0,
+                    CordGuardAnalysisRecordFields.created_at:           now_str,
+                    CordGuardAnalysisRecordFields.updated_at:           now_str,
+                    CordGuardAnalysisRecordFields.file_hash:            f'{CordGuardTableMetadata.FILE_NAME}:{sanitized_file_hash}',
+                }
+            )
         else:
-            logging.info(f'File does not exist in the database, creating new file record.')
-            # Create a file record in the database
-            file_record = await self.create_file_record(cordguard_file)
-            if file_record is None:
-                logging.error(f'Failed to create file record for file: {cordguard_file.file_hash}')
+            logger.info('File does not exist in the database, creating new file and analysis records.')
+            sanitized_analysis_id = self._sanitize_input(cordguard_file.analysis_id)
+            sanitized_file_hash = self._sanitize_input(cordguard_file.file_hash)
+            # Create the file and analysis records together, in one round trip
+            async with self._acquire() as conn:
+                response = await conn.query(_CREATE_FILE_WITH_ANALYSIS_QUERY, {
+                    'file_table': CordGuardTableMetadata.FILE_NAME,
+                    'file_hash': sanitized_file_hash,
+                    'file': cordguard_file.get_dict(),
+                    'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+                    'analysis_id': sanitized_analysis_id,
+                    'analysis': {
+                        CordGuardAnalysisRecordFields.status:               CordGuardAnalysisStatus.PENDING,
+                        CordGuardAnalysisRecordFields.percent_complete:     0,
+                        CordGuardAnalysisRecordFields.created_at:           now_str,
+                        CordGuardAnalysisRecordFields.updated_at:           now_str,
+                        CordGuardAnalysisRecordFields.file_hash:            f'{CordGuardTableMetadata.FILE_NAME}:{sanitized_file_hash}',
+                    },
+                })
+            # One list of created records per CREATE statement
+            created = [result for result in self._query_results(response) if isinstance(result, list)]
+            if len(created) < 2 or not created[-2]:
+                logger.error('Failed to create file record for file: %s', cordguard_file.file_hash)
                 return None
-            logging.info(f'File record created: {file_record}')
-            logging.info(f'Creating new analysis record for file: {cordguard_file.file_hash}')
+            file_record = CordGuardFileRecord(**created[-2][0])
+            analysis_record = created[-1][0] if created[-1] else None
+            logger.info('File record created for hash: %s', file_record.file_hash)
 
-        created_at = datetime.now()
-        updated_at = datetime.now()
-        sanitized_analysis_id = self._sanitize_input(cordguard_file.analysis_id)
-        sanitized_file_hash = self._sanitize_input(file_record.file_hash)
-        
-        analysis_record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.ANALYSIS_NAME}:{sanitized_analysis_id}', 
-            {
-                f'{CordGuardAnalysisRecordFields.status}':               f'{CordGuardAnalysisStatus.PENDING}',
-                f'{CordGuardAnalysisRecordFields.percent_complete}':     0,
-                f'{CordGuardAnalysisRecordFields.created_at}':           f'{created_at}',
-                f'{CordGuardAnalysisRecordFields.updated_at}':           f'{updated_at}',
-                f'{CordGuardAnalysisRecordFields.file_hash}':            f'{CordGuardTableMetadata.FILE_NAME}:{sanitized_file_hash}',
-        }
-        )
-        logging.info(f'Analysis record created: {analysis_record}')
-        return CordGuardAnalysisRecord(file=file_record, analysis_id=cordguard_file.analysis_id, **analysis_record) if analysis_record else None
+        logger.debug('Analysis record created: %s', analysis_record)
+        if not analysis_record:
+            return None
+        _notify_pending_analysis()
+        return CordGuardAnalysisRecord(file=file_record, analysis_id=cordguard_file.analysis_id, **analysis_record)
     
     async def update_analysis_record_status_by_analysis_id(self, analysis_record: CordGuardAnalysisRecord, status: CordGuardAnalysisStatus) -> bool:
         """
@@ -425,59 +855,150 @@ class CordGuardDatabase:
             'completed'
         """
         sanitized_analysis_id = self._sanitize_input(analysis_record.analysis_id)
+        cache_key = (CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id)
+        _record_cache.pop(cache_key)
         analysis_record.updated_at = datetime.now()
         analysis_record.status = status
-        record = await self.surreal_db.update(
-            f'{CordGuardTableMetadata.ANALYSIS_NAME}:{sanitized_analysis_id}', 
-            analysis_record.get_dict()
-        )
-        logging.info(f'Analysis record updated: {record}')
-        return True if record else False
+        # Only the two changed fields are sent, not the whole record
+        async with self._acquire() as conn:
+            response = await conn.query(_UPDATE_ANALYSIS_STATUS_QUERY, {
+                'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+                'analysis_id': sanitized_analysis_id,
+                'status': status,
+                'updated_at': str(analysis_record.updated_at),
+            })
+        record = self._query_results(response)[-1]
+        logger.debug('Analysis record updated: %s', record)
+        if not record:
+            return False
+        # The caller's object now matches the stored row, keep it as the cached copy
+        if sanitized_analysis_id == analysis_record.analysis_id:
+            _record_cache.set(cache_key, analysis_record)
+        return True
 
     async def get_analysis_record_by_analysis_id(self, analysis_id: str, file_record: CordGuardFileRecord = None) -> CordGuardAnalysisRecord | None:
         sanitized_analysis_id = self._sanitize_input(analysis_id)
-        # Get the analysis record from the database
-        record = await self.surreal_db.select(f'{CordGuardTableMetadata.ANALYSIS_NAME}:{sanitized_analysis_id}')
+        cache_key = (CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id)
+        cached = _record_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        # Get the analysis record from the database, with its file record unless one was provided
+        if file_record is None:
+            async with self._acquire() as conn:
+                response = await conn.query(_ANALYSIS_WITH_FILE_QUERY, {
+                    'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+                    'analysis_id': sanitized_analysis_id,
+                    'file_table': CordGuardTableMetadata.FILE_NAME,
+                })
+            found = self._query_results(response)[-1] or {}
+            record = found.get('analysis')
+            if found.get('file'):
+                file_record = self._file_record_from_dict(found['file'])
+        else:
+            record = await self._select_record(CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id)
         if not record:
-            logging.warning(f'No analysis record found for ID: {sanitized_analysis_id}')
+            logger.warning('No analysis record found for ID: %s', sanitized_analysis_id)
             return None
-        
-        # Get the file record from the database if not provided
-        if file_record is None:
-            file_record = await self.get_file_record_by_file_hash(record['file_hash'])
 
         # Create and return the analysis record
-        logging.info(f'Analysis record retrieved: {record}')
-        return CordGuardAnalysisRecord(
-            id=record.get('id', ''),
-            status=record.get('status', ''),
-            file=file_record,
-            file_hash=record.get('file_hash', ''),
-            percent_complete=record.get('percent_complete', 0),
-            created_at=record.get('created_at', datetime.now()),
-            updated_at=record.get('updated_at', datetime.now()),
-            analysis_id=analysis_id
-        )
+        logger.debug('Analysis record retrieved: %s', record)
+        analysis_record = self._analysis_record_from_dict(record, file_record, analysis_id)
+        # Ids that needed sanitizing are not cached, so the cache never answers for a different id
+        if sanitized_analysis_id == analysis_id:
+            _record_cache.set(cache_key, analysis_record)
+        return analysis_record
     
+    async def get_many_analysis_records(self, analysis_ids: list[str]) -> dict[str, CordGuardAnalysisRecord | None]:
+        """
+        Get several analysis records, each with its file record, in a single round trip
+
+        Args:
+            analysis_ids (list[str]): The analysis IDs to look up
+
+        Returns:
+            dict[str, CordGuardAnalysisRecord | None]: The record of every requested ID, None if it does not exist
+        """
+        records: dict[str, CordGuardAnalysisRecord | None] = {}
+        missing: dict[str, str] = {}
+        for analysis_id in analysis_ids:
+            sanitized_analysis_id = self._sanitize_input(analysis_id)
+            cached = _record_cache.get((CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id))
+            if cached is not None:
+                records[analysis_id] = cached
+            else:
+                missing[analysis_id] = sanitized_analysis_id
+        if not missing:
+            return records
+
+        # The lookup of _ANALYSIS_WITH_FILE_QUERY once per ID, each with its own parameter
+        params = {
+            'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+            'file_table': CordGuardTableMetadata.FILE_NAME,
+        }
+        statements = []
+        for index, sanitized_analysis_id in enumerate(missing.values()):
+            params[f'id{index}'] = sanitized_analysis_id
+            statements.append(_ANALYSIS_WITH_FILE_QUERY.replace('$analysis_id', f'$id{index}'))
+        async with self._acquire() as conn:
+            response = await conn.query(''.join(statements), params)
+        # Each lookup is three statements (LET, LET, RETURN), the RETURN holds its result
+        results = self._query_results(response)[2::3]
+
+        for (analysis_id, sanitized_analysis_id), found in zip(missing.items(), results):
+            found = found or {}
+            record = found.get('analysis')
+            if not record:
+                records[analysis_id] = None
+                continue
+            file_record = self._file_record_from_dict(found['file']) if found.get('file') else None
+            analysis_record = self._analysis_record_from_dict(record, file_record, analysis_id)
+            if sanitized_analysis_id == analysis_id:
+                _record_cache.set((CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id), analysis_record)
+            records[analysis_id] = analysis_record
+        logger.debug('Fetched %d analysis records in one batch', len(missing))
+        return records
+
+    async def load_analysis_record(self, analysis_id: str) -> CordGuardAnalysisRecord | None:
+        """
+        Get an analysis record like get_analysis_record_by_analysis_id, batched with concurrent calls
+
+        Lookups made within ANALYSIS_BATCH_WINDOW of each other are fetched together by
+        get_many_analysis_records, so a burst of status polls costs one round trip instead of one each.
+
+        Args:
+            analysis_id (str): The analysis ID to look up
+
+        Returns:
+            CordGuardAnalysisRecord | None: The analysis record with its file record, None if not found
+        """
+        cached = _record_cache.get((CordGuardTableMetadata.ANALYSIS_NAME, analysis_id))
+        if cached is not None:
+            return cached
+        return await self._analysis_loader.load(analysis_id)
+
     async def get_any_pending_analysis(self, file_record: CordGuardFileRecord = None) -> CordGuardAnalysisRecord | None:
         """
         Get any pending analysis
         """
-        record = await self.surreal_db.query(
-            f"SELECT * FROM {CordGuardTableMetadata.ANALYSIS_NAME} WHERE status = '{CordGuardAnalysisStatus.PENDING}' LIMIT 1",
-        )
-        if record is None:
-            logging.info('No pending analysis found.')
-            return None
+        # The pending analysis comes back together with the file it points to
+        async with self._acquire() as conn:
+            response = await conn.query(_PENDING_ANALYSIS_QUERY, {
+                'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+                'status': CordGuardAnalysisStatus.PENDING,
+                'file_table': CordGuardTableMetadata.FILE_NAME,
+            })
         try:
-            record = record[0]["result"][0]
-        except Exception as e:
-            logging.error(f'Error getting pending analysis: {e}, probably no pending analysis')
+            found = self._query_results(response)[-1] or {}
+        except SurrealException as e:
+            logger.error('Error getting pending analysis: %s', e)
             return None
-        logging.info(f'Pending analysis record retrieved: {record}')
-        # Get the file record from the database if not provided
-        if file_record is None and record is not None:
-            file_record = await self.get_file_record_by_file_hash(record['file_hash'])
+        record = found.get('analysis')
+        if not record:
+            logger.info('No pending analysis found.')
+            return None
+        logger.debug('Pending analysis record retrieved: %s', record)
+        if file_record is None and found.get('file'):
+            file_record = self._file_record_from_dict(found['file'])
 
         return CordGuardAnalysisRecord(file=file_record, **record) if record else None
 
@@ -497,13 +1018,41 @@ class CordGuardDatabase:
                 - is_signed: Whether the worker's hardware ID is signed
         """
         sanitized_hwid = self._sanitize_input(worker.signed_hwid)
-        record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.WORKERS_NAME}:{sanitized_hwid}', 
-            worker.get_dict()
-        )
-        logging.info(f'Worker registered: {sanitized_hwid}')
+        _record_cache.pop((CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid))
+        record = await self._create_record(CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid, worker.get_dict())
+        logger.info('Worker registered: %s', sanitized_hwid)
         return worker if record else None
     
+    async def upsert_vm_worker(self, worker: CordguardWorker) -> tuple[CordguardWorker, bool]:
+        """
+        Register a VM worker unless it is already registered, in a single round trip
+
+        Args:
+            worker (CordguardWorker): The worker to register
+
+        Returns:
+            tuple[CordguardWorker, bool]: The registered worker (the stored one if it already existed)
+            and whether it was created by this call
+
+        Raises:
+            SurrealException: If the query failed
+        """
+        sanitized_hwid = self._sanitize_input(worker.signed_hwid)
+        cache_key = (CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid)
+        _record_cache.pop(cache_key)
+        async with self._acquire() as conn:
+            response = await conn.query(_UPSERT_WORKER_QUERY, {
+                'table': CordGuardTableMetadata.WORKERS_NAME,
+                'id': sanitized_hwid,
+                'data': worker.get_dict()
+            })
+        existing = self._query_results(response)[-1]
+        if existing:
+            logger.info('Worker already registered: %s', sanitized_hwid)
+            return self._worker_from_dict(existing), False
+        logger.info('Worker registered: %s', sanitized_hwid)
+        return worker, True
+
     async def get_worker_by_signed_hwid(self, signed_hwid: str) -> CordguardWorker | None:
         """
         Get a worker from the database by signed hardware ID
@@ -515,100 +1064,137 @@ class CordGuardDatabase:
             CordguardWorker | None: The worker if found, None otherwise
         """
         sanitized_hwid = self._sanitize_input(signed_hwid)
-        record = await self.surreal_db.select(f'{CordGuardTableMetadata.WORKERS_NAME}:{sanitized_hwid}')
+        cache_key = (CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid)
+        cached = _record_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        record = await self._select_record(CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid)
         
         if not record:
-            logging.warning(f'No worker found for signed HWID: {sanitized_hwid}')
+            logger.warning('No worker found for signed HWID: %s', sanitized_hwid)
             return None
             
-        logging.info(f'Found worker record: {record}')
-        
-        # Clean up internal DB fields before creating worker object
-        worker_data = record.copy()
-        is_acquired = worker_data.pop('is_acquired', False)
-        worker_data.pop('id', None)
-        
-        # Set status based on acquisition state
-        status = (CordguardWorkerStatus.ACQUIRED if is_acquired 
-                 else CordguardWorkerStatus.NOT_ACQUIRED)
-        
-        return CordguardWorker(**worker_data, status=status)
+        logger.debug('Found worker record: %s', record)
+        worker = self._worker_from_dict(record)
+        if sanitized_hwid == signed_hwid:
+            _record_cache.set(cache_key, worker, ttl=WORKER_RECORD_CACHE_TTL)
+        return worker
 
     async def set_worker_acquired_status(self, worker: CordguardWorker, acquired: bool) -> CordguardWorker | None:
         """
         Update the status of a worker in the database.
         """
         sanitized_hwid = self._sanitize_input(worker.signed_hwid)
+        _record_cache.pop((CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid))
         worker.set_acquired(acquired) 
-        worker = await self.surreal_db.update(
-            f'{CordGuardTableMetadata.WORKERS_NAME}:{sanitized_hwid}', 
-            worker.get_dict()
-        )
+        worker = await self._update_record(CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid, worker.get_dict())
         if worker:
-            logging.info(f'Worker status updated: {sanitized_hwid}, acquired: {acquired}')
+            logger.info('Worker status updated: %s, acquired: %s', sanitized_hwid, acquired)
             del worker['id']
             is_acquired = worker.pop('is_acquired', False)
             status = (CordguardWorkerStatus.ACQUIRED if is_acquired 
                      else CordguardWorkerStatus.NOT_ACQUIRED)
             return CordguardWorker(**worker, status=status)
-        logging.error(f'Failed to update worker status for: {sanitized_hwid}')
+        logger.error('Failed to update worker status for: %s', sanitized_hwid)
         return None
     
-    async def create_mission_for_worker(self, worker: CordguardWorker, analysis: CordGuardAnalysisFile) -> CordguardWorkerMission | None:
+    async def assign_pending_analysis(self, worker: CordguardWorker) -> CordguardWorkerMission | None:
         """
-        Create a new mission for a worker in the database
-        
+        Assign the first pending analysis to a worker in a single transaction
+
+        Finds a pending analysis, marks it as analyzing, marks the worker as acquired and stores its
+        mission, in one round trip and without leaving a half-assigned analysis behind when a step fails.
+        Whether the worker is free is read from its stored row inside the transaction: a worker that is
+        already acquired gets its current mission back instead of a second analysis.
+
         Args:
-            worker (CordguardWorker): The worker to create a mission for
-            mission (CordguardWorkerMission): The mission to create
-            
+            worker (CordguardWorker): The worker to assign the analysis to, marked acquired on success
+                or when it turns out to be acquired already
+
         Returns:
-            CordguardWorkerMission | None: The created mission if successful, containing:
+            CordguardWorkerMission | None: The created mission, or the current one of an acquired worker;
+            None if no analysis is pending, an acquired worker has no mission or the assignment failed
         """
-        analysis_record = await self.get_analysis_record_by_analysis_id(analysis.analysis_id)
-        if analysis_record is None:
-            logging.error(f'Analysis record not found for analysis: {analysis.analysis_id}')
+        sanitized_hwid = self._sanitize_input(worker.signed_hwid)
+        updated_at = datetime.now()
+        try:
+            async with self._acquire() as conn:
+                response = await conn.query(_ASSIGN_PENDING_ANALYSIS_QUERY, {
+                    'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+                    'file_table': CordGuardTableMetadata.FILE_NAME,
+                    'workers_table': CordGuardTableMetadata.WORKERS_NAME,
+                    'missions_table': CordGuardTableMetadata.MISSIONS_NAME,
+                    'pending': CordGuardAnalysisStatus.PENDING,
+                    'analyzing': CordGuardAnalysisStatus.ANALYZING,
+                    'updated_at': str(updated_at),
+                    'worker_id': sanitized_hwid,
+                    'mission_worker_id': worker.signed_hwid,
+                    'mission_id': create_trackable_id(),
+                    'worker': {**worker.get_dict(), 'is_acquired': True},
+                })
+            found = self._query_results(response)[-1] or {}
+        except SurrealException as e:
+            logger.error('Pending analysis not assigned to worker %s: %s', worker.signed_hwid, e)
             return None
-        
-        file_record = await self.get_file_record_by_file_hash(analysis_record.file_hash)
-        if file_record is None:
-            logging.error(f'File record not found for analysis: {analysis_record.file_hash}')
+        record = found.get('mission')
+        if found.get('acquired'):
+            worker.set_acquired(True)
+            _record_cache.pop((CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid))
+            if not record:
+                logger.error('Worker %s is acquired but has no mission.', worker.signed_hwid)
+                return None
+            analysis_id = found['analysis_id']
+            file_record = self._file_record_from_dict(record['file'])
+            analysis_record = self._analysis_record_from_dict(record['analysis'], file_record, analysis_id)
+            logger.info('Worker %s is already acquired, returning its mission.', worker.signed_hwid)
+            return CordguardWorkerMission(worker, analysis_record, file_record, mission_id=record.get('mission_id'))
+        if not record:
+            # The stored worker is free, whatever a cached copy said
+            if worker.is_acquired():
+                worker.set_acquired(False)
+            logger.info('No pending analysis found.')
             return None
-        
-        mission = CordguardWorkerMission(worker, analysis_record, file_record)
 
-        record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.MISSIONS_NAME}:{worker.signed_hwid}', 
-            mission.get_dict()
-        )
-        logging.info(f'Mission created for worker: {worker.signed_hwid}')
-        return mission if record else None
-    
+        analysis_id = found['analysis_id']
+        _record_cache.pop((CordGuardTableMetadata.ANALYSIS_NAME, analysis_id))
+        worker.set_acquired(True)
+        # The worker row now holds exactly this worker, so it is cached instead of dropped
+        if sanitized_hwid == worker.signed_hwid:
+            _record_cache.set((CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid), worker, ttl=WORKER_RECORD_CACHE_TTL)
+        file_record = self._file_record_from_dict(record['file'])
+        analysis_record = self._analysis_record_from_dict(record['analysis'], file_record, analysis_id)
+        mission = CordguardWorkerMission(worker, analysis_record, file_record, mission_id=record['mission_id'])
+        logger.info('Analysis %s assigned to worker: %s', analysis_id, worker.signed_hwid)
+        return mission
+
     async def get_mission_by_worker_signed_hwid(self, signed_hwid: str) -> CordguardWorkerMission | None:
         """
         Get a mission from the database by worker signed hardware ID
         """
-        record = await self.surreal_db.select(f'{CordGuardTableMetadata.MISSIONS_NAME}:{signed_hwid}')
+        record = await self._select_record(CordGuardTableMetadata.MISSIONS_NAME, signed_hwid)
         if record is None:
-            logging.warning(f'No mission found for worker signed HWID: {signed_hwid}')
+            logger.warning('No mission found for worker signed HWID: %s', signed_hwid)
             return None
-        analysis_record = await self.get_analysis_record_by_analysis_id(record['file']['analysis_id'])
+        # The mission row already names the analysis and the file, fetch them with the worker at once
+        analysis_record, file_record, worker = await asyncio.gather(
+            self.get_analysis_record_by_analysis_id(record['file']['analysis_id']),
+            self.get_file_record_by_file_hash(record['file']['file_hash']),
+            self.get_worker_by_signed_hwid(signed_hwid),
+        )
         if analysis_record is None:
-            logging.warning(f'No analysis record found for mission: {record}')
+            logger.warning('No analysis record found for mission of worker: %s', signed_hwid)
             return None
-        file_record = await self.get_file_record_by_file_hash(analysis_record.file_hash)
         if file_record is None:
-            logging.warning(f'No file record found for analysis: {analysis_record.file_hash}')
+            logger.warning('No file record found for analysis: %s', analysis_record.file_hash)
             return None
         del record['id']
 
-        worker = await self.get_worker_by_signed_hwid(signed_hwid)
         if worker is None:
-            logging.warning(f'No worker found for signed HWID: {signed_hwid}')
+            logger.warning('No worker found for signed HWID: %s', signed_hwid)
             return None
 
-        logging.info(f'Mission retrieved for worker: {signed_hwid}')
-        return CordguardWorkerMission(worker=worker, analysis=analysis_record, file=file_record) if record else None
+        logger.info('Mission retrieved for worker: %s', signed_hwid)
+        return CordguardWorkerMission(worker=worker, analysis=analysis_record, file=file_record, mission_id=record.get('mission_id')) if record else None
     
     async def create_result_for_mission(self, analysis_id: str, result: dict) -> dict | None:
         """
@@ -616,52 +1202,169 @@ class CordGuardDatabase:
         """
         
         # Create record with proper dictionary structure
-        record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.RESULTS_NAME}:{analysis_id}', 
+        record = await self._create_record(
+            CordGuardTableMetadata.RESULTS_NAME, analysis_id,
             {
                 'result_data': result,
                 'created_at': str(datetime.now())
             }
         )
-        logging.info(f'Result created for mission: {analysis_id}')
+        logger.info('Result created for mission: %s', analysis_id)
         return result if record else None
 
+    async def save_mission_result(self, result: CordguardResult, status: CordGuardAnalysisStatus) -> tuple[bool, bool] | None:
+        """
+        Store the result of a mission in a single transaction
+
+        Does what update_analysis_record_status_by_analysis_id, set_worker_acquired_status and
+        create_result_for_mission do in sequence, in one round trip. Nothing is written unless
+        both the analysis and the worker exist.
+
+        Args:
+            result (CordguardResult): The result sent by the worker
+            status (CordGuardAnalysisStatus): The final status of the analysis
+
+        Returns:
+            tuple[bool, bool] | None: Whether the analysis and the worker were found (the result
+            was stored if both were), None if the transaction failed
+        """
+        sanitized_analysis_id = self._sanitize_input(result.analysis_id)
+        sanitized_hwid = self._sanitize_input(result.signed_hwid)
+        try:
+            async with self._acquire() as conn:
+                response = await conn.query(_SAVE_MISSION_RESULT_QUERY, {
+                    'analysis_table': CordGuardTableMetadata.ANALYSIS_NAME,
+                    'analysis_id': sanitized_analysis_id,
+                    'workers_table': CordGuardTableMetadata.WORKERS_NAME,
+                    'worker_id': sanitized_hwid,
+                    'results_table': CordGuardTableMetadata.RESULTS_NAME,
+                    'result_id': result.analysis_id,
+                    'result_data': result if _ENCODES_DATACLASSES else result.get_dict(),
+                    'status': status,
+                    'updated_at': str(datetime.now()),
+                })
+            found = self._query_results(response)[-1] or {}
+        except SurrealException as e:
+            logger.error('Result not saved for analysis %s: %s', result.analysis_id, e)
+            return None
+        _record_cache.pop((CordGuardTableMetadata.ANALYSIS_NAME, sanitized_analysis_id))
+        _record_cache.pop((CordGuardTableMetadata.WORKERS_NAME, sanitized_hwid))
+        analysis_found, worker_found = bool(found.get('analysis')), bool(found.get('worker'))
+        if analysis_found and worker_found:
+            logger.info('Result saved for analysis %s with status %s', result.analysis_id, status)
+        return analysis_found, worker_found
+
     async def get_analysis_results_by_analysis_id(self, analysis_id: str) -> CordguardResult | None:
         """
         Get the results of an analysis by analysis_id
         """
         sanitized_analysis_id = self._sanitize_input(analysis_id)
-        record = await self.surreal_db.select(f'{CordGuardTableMetadata.RESULTS_NAME}:{sanitized_analysis_id}')
-        logging.info(f'Analysis results retrieved for ID: {sanitized_analysis_id}')
+        record = await self._select_record(CordGuardTableMetadata.RESULTS_NAME, sanitized_analysis_id)
+        logger.info('Analysis results retrieved for ID: %s', sanitized_analysis_id)
         return CordguardResult.from_dict(record['result_data']) if record else None
     
     async def create_waitlist_entry(self, feature: str, email: str) -> bool:
         """
         Create a waitlist entry in the database
         """
-        record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.WAITLIST_NAME}:{feature}', 
-            {'email': email}
-        )
-        logging.info(f'Waitlist entry created for feature: {feature}, email: {email}')
+        record = await self._create_record(CordGuardTableMetadata.WAITLIST_NAME, feature, {'email': email})
+        logger.info('Waitlist entry created for feature: %s, email: %s', feature, email)
         return True if record else False
     
     async def save_ai_response(self, analysis_id: str, analyzed_text: str, ai_response: dict) -> bool:
         """
         Save the AI response to the database
         """
-        record = await self.surreal_db.create(
-            f'{CordGuardTableMetadata.AI_RESPONSES_NAME}:{analysis_id}', 
+        record = await self._create_record(
+            CordGuardTableMetadata.AI_RESPONSES_NAME, analysis_id,
             {'analyzed_text': analyzed_text, 'ai_response': ai_response}
         )
-        logging.info(f'AI response saved for analysis ID: {analysis_id}')
+        logger.info('AI response saved for analysis ID: %s', analysis_id)
         return True if record else False
     
     async def get_ai_response_by_analysis_id(self, analysis_id: str) -> OpenAIResponse | None:
         """
         Get the AI response by analysis_id
         """
-        record = await self.surreal_db.select(f'{CordGuardTableMetadata.AI_RESPONSES_NAME}:{analysis_id}')
-        logging.info(f'AI response retrieved for analysis ID: {analysis_id}')
+        record = await self._select_record(CordGuardTableMetadata.AI_RESPONSES_NAME, analysis_id)
+        logger.info('AI response retrieved for analysis ID: %s', analysis_id)
         openai_response = OpenAIResponse.from_dict(record['ai_response']) if record else None
-        return openai_response if record else None
\ No newline at end of file
+        return openai_response if record else None
+
+
+# Set when this process queues a new analysis, so workers waiting for a mission are woken right away.
+# Replaced after each notification; waiters still re-check the queue on a timeout, as analyses
+# queued by other server processes are not signalled.
+_pending_analysis_event: asyncio.Event | None = None
+
+def _notify_pending_analysis() -> None:
+    """Wake every coroutine waiting in wait_for_pending_analysis()"""
+    global _pending_analysis_event
+    if _pending_analysis_event is not None:
+        _pending_analysis_event.set()
+        _pending_analysis_event = None
+
+async def wait_for_pending_analysis(timeout: float) -> bool:
+    """
+    Wait until this process queues a new analysis, for at most timeout seconds.
+
+    Args:
+        timeout (float): Maximum number of seconds to wait
+
+    Returns:
+        bool: True if a new analysis was queued, False on timeout
+    """
+    global _pending_analysis_event
+    if _pending_analysis_event is None:
+        _pending_analysis_event = asyncio.Event()
+    try:
+        await asyncio.wait_for(_pending_analysis_event.wait(), timeout)
+    except TimeoutError:
+        return False
+    return True
+
+# Process-wide database instance shared by every request, created by init_db_pool()
+_shared_db: CordGuardDatabase | None = None
+_shared_db_lock = asyncio.Lock()
+
+async def init_db_pool(size: int | None = None) -> None:
+    """
+    Create the process-wide database instance and its connection pool.
+
+    Called from the application startup hook; get_db() also calls it lazily so a
+    database that was down at startup is picked up once it becomes reachable.
+
+    Args:
+        size (int | None): Maximum number of pooled connections, defaults to SURREALDB_POOL_SIZE (10)
+    """
+    global _shared_db
+    async with _shared_db_lock:
+        if _shared_db is not None:
+            return
+        if size is None:
+            size = int(os.getenv('SURREALDB_POOL_SIZE', '10'))
+        _shared_db = await CordGuardDatabase.create(pool_size=size)
+        logger.info('SurrealDB pool initialized with up to %d connections', size)
+
+async def close_db_pool() -> None:
+    """Close the pooled connections. Called from the application shutdown hook."""
+    global _shared_db
+    db, _shared_db = _shared_db, None
+    if db is not None:
+        await db.close()
+
+async def get_db() -> CordGuardDatabase:
+    """
+    FastAPI dependency returning the process-wide CordGuardDatabase.
+
+    The instance is shared by all requests; each database call borrows its own pooled
+    connection, so concurrent requests do not wait on each other's queries.
+
+    Example:
+        >>> @router.post("/route")
+        >>> async def route(db: CordGuardDatabase = Depends(get_db)):
+        >>>     ...
+    """
+    if _shared_db is None:
+        await init_db_pool()
+    return _shared_db
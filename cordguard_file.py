@@ -22,14 +22,15 @@ File Processing Flow:
 ID Generation:
 ------------
 - Analysis IDs: Generated using timestamp and random components via cordguard_codes
-- File IDs: Generated as random hex strings using secrets module
-- File Hashes: SHA256 hashes of file content for integrity verification
+- File IDs: Generated as random hex strings from os.urandom
+- File Hashes: SHA256 hashes of file content for integrity verification, streamed from
+  the file object when the content is not held in memory
 
 Dependencies:
 -----------
 - hashlib: For file content hashing
-- secrets: For secure ID generation
-- boto3: For S3 operations
+- os: For secure ID generation
+- cordguard_globals: For the shared boto3 S3 client
 - cordguard_codes: For trackable ID generation
 - datetime: For date-based folder organization
 - cordguard_utils: For file extension extraction
@@ -58,14 +59,91 @@ Version: 1.0.0
 """
 import hashlib
 import logging
-import secrets
 from datetime import datetime
 import time
+from functools import cached_property
 from cordguard_codes import create_trackable_id
 from cordguard_utils import extract_file_extension
-import boto3
+import io
 import os
-#from cordguard_globals import AWS_CONFIG
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor
+import cordguard_globals
+
+logger = logging.getLogger(__name__)
+
+# hashlib.sha256 is OpenSSL's one-shot constructor, which already dispatches to the CPU's SHA
+# extensions (SHA-NI on x86, SHA2 instructions on ARMv8) and falls back to portable code elsewhere.
+# hashlib.new('sha256') would only add a name lookup on top of it.
+_sha256 = hashlib.sha256
+
+# secrets.token_hex is a wrapper around os.urandom(n).hex(); call the CSPRNG directly for file IDs
+_urandom = os.urandom
+
+def hash_file_object(file_obj) -> str:
+    """
+    Compute the SHA256 hex digest of a seekable binary file without loading it into memory.
+
+    Args:
+        file_obj: Seekable binary file, rewound before and after hashing
+
+    Returns:
+        str: SHA256 hex digest of the content
+    """
+    file_obj.seek(0)
+    try:
+        return hashlib.file_digest(file_obj, _sha256).hexdigest()
+    finally:
+        file_obj.seek(0)
+
+def hash_file_content(file_content: bytes) -> str:
+    """
+    Compute the SHA256 hex digest used to identify a file's content.
+
+    Args:
+        file_content (bytes): Raw content of the file
+
+    Returns:
+        str: SHA256 hex digest of the content
+    """
+    return _sha256(file_content).hexdigest()
+
+# Hashes in-memory content while upload_to_s3 sends it; hashlib releases the GIL while hashing buffers
+# larger than 2KB, so the hash really overlaps the upload. Threads are only started on first use.
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='cordguard-hash')
+
+# English day names for the S3 folders, indexed by datetime.weekday(); strftime('%A') would follow LC_TIME
+_DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Files above 5MB (the smallest part S3 accepts) are uploaded as 5MB parts sent concurrently, so even
+# a sample near MAX_FILE_SIZE goes up as several parallel requests; smaller ones in a single PUT
+UPLOAD_PART_SIZE = 5 * 1024 * 1024
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=UPLOAD_PART_SIZE,
+    multipart_chunksize=UPLOAD_PART_SIZE,
+    max_concurrency=8,
+    use_threads=True
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Opt-in (S3_COMPRESSION=zstd): samples are stored zstd-compressed with Content-Encoding: zstd, so
+# every consumer of the stored objects must be able to decode it before this is turned on
+S3_COMPRESSION_LEVEL = 3
+_COMPRESS_UPLOADS = os.getenv('S3_COMPRESSION', '').lower() == 'zstd'
+if _COMPRESS_UPLOADS and zstandard is None:
+    logger.warning('S3_COMPRESSION=zstd is set but zstandard is not installed, uploads stay uncompressed')
+    _COMPRESS_UPLOADS = False
+
+# Already-compressed formats gain nothing from another pass
+_INCOMPRESSIBLE_TYPES = frozenset((
+    'application/zip', 'application/gzip', 'application/x-gzip', 'application/x-7z-compressed',
+    'application/x-rar-compressed', 'application/vnd.rar', 'application/x-xz', 'application/zstd'
+))
 
 class CordGuardAnalysisFile:
     """
@@ -81,11 +159,14 @@ class CordGuardAnalysisFile:
         file_type (str): MIME type of the file
         file_size (int): Size of the file in bytes
         file_content (bytes): Raw content of the file
+        file_obj: Seekable binary file holding the content instead of file_content, or None
         s3_client: Boto3 S3 client for S3 operations
         bucket_name_s3 (str): Name of the S3 bucket for storage
     """
 
-    def __init__(self, file_name: str = "", file_type: str = "", file_size: int = 0, file_content: bytes = b"", s3_client = None, bucket_name_s3: str = ""):
+    def __init__(self, file_name: str = "", file_type: str = "", file_size: int = 0, file_content: bytes | bytearray | memoryview = b"", s3_client = None, bucket_name_s3: str = "",
+                 analysis_id: str | None = None, file_id: str | None = None, current_timestamp: int | None = None, file_hash: str | None = None,
+                 file_obj = None):
         """
         Initialize a new CordGuardAnalysisFile instance.
 
@@ -93,44 +174,68 @@ class CordGuardAnalysisFile:
             file_name (str): Name of the file
             file_type (str): MIME type of the file
             file_size (int): Size of the file in bytes
-            file_content (bytes): Raw content of the file
-            s3_client: Boto3 S3 client instance
+            file_content (bytes | bytearray | memoryview): Raw content of the file, kept as given without
+                a copy. Pass bytes where possible: the upload wraps it in a BytesIO, which shares a
+                bytes buffer but copies any other buffer type.
+            s3_client: Boto3 S3 client instance, defaults to the shared client from cordguard_globals
             bucket_name_s3 (str): Name of the S3 bucket
+            analysis_id (str, optional): Existing analysis ID, for a file whose upload session was started earlier
+            file_id (str, optional): Existing file ID, together with analysis_id
+            current_timestamp (int, optional): Timestamp the IDs were generated at, together with analysis_id
+            file_hash (str, optional): Precomputed SHA256 hex digest, for content that was hashed elsewhere.
+                Otherwise the hash is computed on first access, so rejected uploads never pay for it.
+            file_obj (optional): Seekable binary file holding the content, e.g. the spooled file of an
+                upload. It is hashed and uploaded by streaming, so the content is never loaded into memory.
         """
-        logging.info(f'Initializing CordGuardAnalysisFile with file_name: {file_name}, file_type: {file_type}, file_size: {file_size}')
-        self.current_timestamp = int(time.time())
-        self.analysis_id = create_trackable_id(self.current_timestamp)
-        logging.info(f'Generated analysis_id: {self.analysis_id}')
-        self.file_id = secrets.token_hex(16)
-        logging.info(f'Generated file_id: {self.file_id}')
+        logger.info('Initializing CordGuardAnalysisFile with file_name: %s, file_type: %s, file_size: %s', file_name, file_type, file_size)
+        self.current_timestamp = int(time.time()) if current_timestamp is None else current_timestamp
+        self.analysis_id = create_trackable_id(self.current_timestamp) if analysis_id is None else analysis_id
+        logger.info('Using analysis_id: %s', self.analysis_id)
+        self.file_id = _urandom(16).hex() if file_id is None else file_id
+        logger.info('Using file_id: %s', self.file_id)
         self.file_name: str = file_name
-        self.file_extension: str = extract_file_extension(file_name)
         self.file_type: str = file_type
         self.file_size: int = file_size
-        self.file_content: bytes = file_content
+        self.file_content: bytes | bytearray | memoryview = file_content
+        self.file_obj = file_obj
         if s3_client is None:
-             # AWS Configuration
-            AWS_CONFIG = { # TODO: Move to globals when you find a stable way to handle it
-                'access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
-                'secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
-                'endpoint_url': os.getenv('AWS_ENDPOINT_URL_S3'),
-                'region': os.getenv('AWS_REGION')
-            }
-
-            self.s3_client =  boto3.client(
-            's3',
-            aws_access_key_id=AWS_CONFIG['access_key_id'],
-            aws_secret_access_key=AWS_CONFIG['secret_access_key'],
-            endpoint_url=AWS_CONFIG['endpoint_url'],
-            region_name=AWS_CONFIG['region']
-            )
-            logging.info('Initialized new S3 client with provided AWS configuration.')
+            self.s3_client = cordguard_globals.S3_CLIENT
         else:
             self.s3_client = s3_client
-            logging.info('Using provided S3 client instance.')
+            logger.info('Using provided S3 client instance.')
         self.bucket_name_s3 = bucket_name_s3
-        self.file_hash: str = hashlib.sha256(file_content).hexdigest()
-        logging.info(f'Calculated file hash: {self.file_hash}')
+        self._endpoint_url: str = self.s3_client.meta.endpoint_url
+        if file_hash is not None:
+            self.file_hash = file_hash
+            logger.info('Using file hash: %s', file_hash)
+
+    @cached_property
+    def file_hash(self) -> str:
+        """SHA256 hex digest of the file content, computed on first access."""
+        if self.file_obj is not None:
+            return hash_file_object(self.file_obj)
+        return hash_file_content(self.file_content)
+
+    @property
+    def is_hashed(self) -> bool:
+        """Whether file_hash has been computed or provided."""
+        return 'file_hash' in self.__dict__
+
+    @cached_property
+    def file_extension(self) -> str:
+        """Full extension of the file name, extracted on first access."""
+        return extract_file_extension(self.file_name)
+
+    @cached_property
+    def _s3_key(self) -> str:
+        """S3 key of the file, built once since its parts never change after construction."""
+        # For organization, we use date month and year to create the folder structure
+        # YYYY-mm, then inside we put the day number and day name for more order
+        date_time = datetime.fromtimestamp(self.current_timestamp)
+        s3_key = (f'analysis/{date_time.year:04d}-{date_time.month:02d}/{date_time.day:02d}_{_DAY_NAMES[date_time.weekday()]}/'
+                  f'{self.analysis_id}-{self.file_id}/{self.file_name}')
+        logger.info('Generated S3 key: %s for file_id: %s', s3_key, self.file_id)
+        return s3_key
 
     # @staticmethod
     # def from_dict(data: dict) -> 'CordGuardAnalysisFile':
@@ -151,7 +256,7 @@ class CordGuardAnalysisFile:
         Returns:
             dict: Dictionary containing file metadata
         """
-        logging.info(f'Converting file object to dictionary for file_id: {self.file_id}')
+        logger.info('Converting file object to dictionary for file_id: %s', self.file_id)
         return {
             'analysis_id': self.analysis_id,
             'file_id': self.file_id,
@@ -168,42 +273,180 @@ class CordGuardAnalysisFile:
         Upload the file content to S3.
 
         Attempts to upload the file content to S3 using the generated key path.
-        Logs the upload process and any errors that occur.
+        Logs the upload process and any errors that occur. If the file was not hashed yet,
+        its hash is computed on the hash pool while the upload is in flight. Content held in a
+        file_obj is streamed to S3 from the file. With S3_COMPRESSION=zstd, compressible
+        content is stored zstd-encoded.
 
         Returns:
             bool: True if upload successful, False otherwise
         """
         if self.file_content is None or self.file_size == 0 or self.file_type is None or self.s3_client is None or self.bucket_name_s3 is None:
-            logging.error(f'{self.file_id} File content is None or invalid parameters')
+            logger.error('%s File content is None or invalid parameters', self.file_id)
             return False
-        logging.info(f'Uploading {self.file_id} to S3 at key: {self.get_s3_key()} in bucket: {self.bucket_name_s3}')
+        logger.info('Uploading %s to S3 at key: %s in bucket: %s', self.file_id, self.get_s3_key(), self.bucket_name_s3)
+        pending_hash = None
+        if self.file_obj is not None:
+            # A file has a single position, so its hash cannot be read while the upload reads it
+            if not self.is_hashed:
+                self.file_hash = hash_file_object(self.file_obj)
+        elif not self.is_hashed:
+            # Both passes only read file_content, so the hash can overlap the network round trip
+            pending_hash = _hash_executor.submit(hash_file_content, self.file_content)
         try:
-            self.s3_client.put_object(Bucket=self.bucket_name_s3, Key=self.get_s3_key(), Body=self.file_content)
-            logging.info(f'{self.file_id} uploaded to S3 successfully')
+            extra_args = None
+            if self.file_obj is not None:
+                self.file_obj.seek(0)
+                body = self.file_obj
+            else:
+                body = io.BytesIO(self.file_content)
+            if _COMPRESS_UPLOADS and self.file_type not in _INCOMPRESSIBLE_TYPES:
+                # Compressor objects are not thread-safe and uploads run on several threads, so one per upload
+                body = zstandard.ZstdCompressor(level=S3_COMPRESSION_LEVEL).stream_reader(body)
+                extra_args = {'ContentEncoding': 'zstd'}
+                logger.info('Compressing %s (%s bytes) for upload', self.file_id, self.file_size)
+            self.s3_client.upload_fileobj(body, self.bucket_name_s3, self.get_s3_key(), ExtraArgs=extra_args, Config=_TRANSFER_CONFIG)
+            logger.info('%s uploaded to S3 successfully', self.file_id)
         except Exception as e:
-            logging.error(f'Error uploading {self.file_id} to S3: {e}')
+            logger.error('Error uploading %s to S3: %s', self.file_id, e)
             return False
+        finally:
+            if pending_hash is not None:
+                self.file_hash = pending_hash.result()
         return True
     
+    def start_multipart_upload(self, part_size: int, expires_in: int = 3600) -> dict | None:
+        """
+        Open a multipart upload for this file and pre-sign one URL per part.
+
+        The client then PUTs each part straight to S3, so the file never passes through the API.
+
+        Args:
+            part_size (int): Size of every part but the last, at least 5MB as required by S3
+            expires_in (int): Lifetime of the pre-signed URLs in seconds
+
+        Returns:
+            dict | None: upload_id and the list of parts (part_number, url), or None on failure
+        """
+        s3_key = self.get_s3_key()
+        try:
+            upload = self.s3_client.create_multipart_upload(Bucket=self.bucket_name_s3, Key=s3_key)
+            upload_id = upload['UploadId']
+            part_count = max(1, -(-self.file_size // part_size))
+            parts = [
+                {
+                    'part_number': part_number,
+                    'url': self.s3_client.generate_presigned_url(
+                        'upload_part',
+                        Params={'Bucket': self.bucket_name_s3, 'Key': s3_key, 'UploadId': upload_id, 'PartNumber': part_number},
+                        ExpiresIn=expires_in
+                    )
+                }
+                for part_number in range(1, part_count + 1)
+            ]
+        except Exception as e:
+            logger.error('Error starting multipart upload for %s: %s', self.file_id, e)
+            return None
+        logger.info('Multipart upload %s started for %s with %s parts', upload_id, self.file_id, part_count)
+        return {'upload_id': upload_id, 'parts': parts}
+
+    def complete_multipart_upload(self, upload_id: str, parts: list[dict]) -> bool:
+        """
+        Assemble the parts a client uploaded through start_multipart_upload().
+
+        S3 binds upload_id to the object key, so a session whose IDs were tampered with fails here.
+
+        Args:
+            upload_id (str): The upload ID returned by start_multipart_upload()
+            parts (list[dict]): part_number and etag of every uploaded part
+
+        Returns:
+            bool: True if the object was assembled, False otherwise
+        """
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name_s3,
+                Key=self.get_s3_key(),
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [{'PartNumber': part['part_number'], 'ETag': part['etag']} for part in sorted(parts, key=lambda part: part['part_number'])]}
+            )
+        except Exception as e:
+            logger.error('Error completing multipart upload %s for %s: %s', upload_id, self.file_id, e)
+            return False
+        logger.info('Multipart upload %s completed for %s', upload_id, self.file_id)
+        return True
+
+    def read_uploaded_object(self, max_size: int, head_size: int = 4096, chunk_size: int = 1024 * 1024) -> tuple[str, bytes, int] | None:
+        """
+        Stream the stored object back once to hash it and keep its first bytes for type detection.
+
+        Args:
+            max_size (int): Objects larger than this are rejected
+            head_size (int): Number of leading bytes to return
+            chunk_size (int): Read size while streaming
+
+        Returns:
+            tuple[str, bytes, int] | None: (SHA256 hex digest, leading bytes, size), or None if the
+            object is missing, empty or larger than max_size
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name_s3, Key=self.get_s3_key())
+            size = response['ContentLength']
+            if size == 0 or size > max_size:
+                logger.error('Uploaded object for %s has invalid size: %s', self.file_id, size)
+                response['Body'].close()
+                return None
+            hasher = _sha256()
+            head = b''
+            for chunk in response['Body'].iter_chunks(chunk_size):
+                if len(head) < head_size:
+                    head += chunk[:head_size - len(head)]
+                hasher.update(chunk)
+        except Exception as e:
+            logger.error('Error reading uploaded object for %s: %s', self.file_id, e)
+            return None
+        return hasher.hexdigest(), head, size
+
+    def delete_from_s3(self) -> bool:
+        """
+        Delete the stored object, e.g. a duplicate or rejected upload.
+
+        Returns:
+            bool: True if the object was deleted, False otherwise
+        """
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket_name_s3, Key=self.get_s3_key())
+        except Exception as e:
+            logger.error('Error deleting %s from S3: %s', self.file_id, e)
+            return False
+        logger.info('%s deleted from S3', self.file_id)
+        return True
+
     def get_content(self):
         """
-        Get the file content.
+        Get the file content, read from file_obj when the content is not held in memory.
         """
-        logging.info(f'Getting content for file_id: {self.file_id}')
+        logger.info('Getting content for file_id: %s', self.file_id)
+        if self.file_obj is not None:
+            self.file_obj.seek(0)
+            try:
+                return self.file_obj.read()
+            finally:
+                self.file_obj.seek(0)
         return self.file_content
     
     def get_analysis_id(self):
         """
         Get the analysis ID.
         """
-        logging.info(f'Getting analysis ID for file_id: {self.file_id}')
+        logger.info('Getting analysis ID for file_id: %s', self.file_id)
         return self.analysis_id
     
     def get_file_id(self):
         """
         Get the file ID.
         """
-        logging.info(f'Getting file ID for file_id: {self.file_id}')
+        logger.info('Getting file ID for file_id: %s', self.file_id)
         return self.file_id
 
     def get_s3_key(self):
@@ -213,20 +456,12 @@ class CordGuardAnalysisFile:
         Returns:
             str: S3 key path in format 'analysis/{analysis_id}/{file_id}'
         """
-        # For organization, we use date month and year to create the folder structure
-        # YYYY-mm, then inside we put the day number and day name for more order
-        date_time = datetime.fromtimestamp(self.current_timestamp)
-        year_month = date_time.strftime('%Y-%m')
-        day_number = date_time.strftime('%d')
-        day_name = date_time.strftime('%A')
-        s3_key = f'analysis/{year_month}/{day_number}_{day_name}/{self.analysis_id}-{self.file_id}/{self.file_name}'
-        logging.info(f'Generated S3 key: {s3_key} for file_id: {self.file_id}')
-        return s3_key
+        return self._s3_key
     
     def get_full_url_to_file(self):
         """
         Get the full URL to the file in S3.
         """
-        full_url = f'{self.s3_client.meta.endpoint_url}/{self.bucket_name_s3}/{self.get_s3_key()}'
-        logging.info(f'Generated full URL to file: {full_url}')
+        full_url = f'{self._endpoint_url}/{self.bucket_name_s3}/{self._s3_key}'
+        logger.info('Generated full URL to file: %s', full_url)
         return full_url
\ No newline at end of file
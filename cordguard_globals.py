@@ -8,25 +8,27 @@ Key Components:
 -------------
 - Environment Loading: Loads configuration from .env files
 - AWS Configuration: S3 client settings and bucket configuration  
-- Database Connection: Async initialization of SurrealDB connection
-- Logging: Application-wide logging configuration
-- Initialization Control: Single initialization guarantee via _initialized flag
+- Boto Session: One boto3 session holding the credentials and the loaded endpoint/service data
+- S3 Client: One boto3 client shared by every file object
+- Logging: Module logger (the root configuration is done once in app.py)
+- Initialization Control: Lazy, single initialization on first attribute access (PEP 562)
 
 Configuration Flow:
 ----------------
-1. Environment variables loaded from .env file
-2. AWS S3 configuration extracted and validated
+1. Environment variables loaded from .env file at import, as other modules read them at import too
+2. On first access to AWS_CONFIG, BUCKET_NAME_S3, BOTO_SESSION or S3_CLIENT, the AWS S3
+   configuration is extracted and the shared session and S3 client created
 3. Logging initialized with secure secret handling
-4. Database connection established in new event loop
-5. Global state tracked to prevent re-initialization
+4. Global state tracked to prevent re-initialization
+
+Entrypoints that never touch S3 (CLI tools, tests) therefore never import boto3 or build a client.
 
 Dependencies:
 -----------
 - os: Environment variable access
 - dotenv: .env file loading
+- boto3: Shared S3 client
 - logging: Application logging
-- asyncio: Async database initialization
-- cordguard_database: Database interface
 
 Author: v0id_user <contact@v0id.me>
 Security Contact: CordGuard Security Team <security@cordguard.org>
@@ -35,27 +37,39 @@ Version: 1.0.0
 """
 
 import os
-# import boto3
 # from cordguard_queue import CordGuardQueue
 import logging
-from dotenv import load_dotenv
-import asyncio
 import threading
-from cordguard_database import CordGuardDatabase
+from dotenv import load_dotenv
 # Global flag to ensure single initialization
 _initialized = False
+_initialize_lock = threading.Lock()
+
+# Names created by globals_initialize() on first access
+_LAZY_GLOBALS = frozenset(('AWS_CONFIG', 'BUCKET_NAME_S3', 'BOTO_SESSION', 'S3_CLIENT'))
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Other modules read their settings with os.getenv at import, so .env is loaded right away
+load_dotenv()
+
 def globals_initialize():
+    with _initialize_lock:
+        if _initialized:
+            return
+        _initialize()
+
+def _initialize():
     global _initialized,\
           AWS_CONFIG, \
-          BUCKET_NAME_S3
-        
-    if _initialized:
-        return
-    load_dotenv()
+          BUCKET_NAME_S3, \
+          BOTO_SESSION, \
+          S3_CLIENT
+
+    # boto3 is only imported once something actually needs S3
+    import boto3
+    from botocore.config import Config
+
     # AWS Configuration
     AWS_CONFIG = {
         'access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
@@ -65,6 +79,24 @@ def globals_initialize():
     }
 
     BUCKET_NAME_S3 = os.getenv('BUCKET_NAME_S3')
+
+    # A session caches the endpoint resolver and service models it loads, so any further client
+    # (BOTO_SESSION.client(...)) is created without parsing botocore's data files again
+    BOTO_SESSION = boto3.session.Session(
+        aws_access_key_id=AWS_CONFIG['access_key_id'],
+        aws_secret_access_key=AWS_CONFIG['secret_access_key'],
+        region_name=AWS_CONFIG['region']
+    )
+
+    # Client construction loads botocore's service models, so it is done once and the
+    # (thread-safe) client is shared by every CordGuardAnalysisFile. Uploads run concurrently on
+    # worker threads, so its connection pool must be larger than botocore's default of 10,
+    # otherwise extra uploads wait for a free connection instead of overlapping their round trips.
+    S3_CLIENT = BOTO_SESSION.client(
+        's3',
+        endpoint_url=AWS_CONFIG['endpoint_url'],
+        config=Config(max_pool_connections=int(os.getenv('S3_MAX_POOL_CONNECTIONS', '50')))
+    )
      
     # Log configuration (safely handling secrets)
     logger.info(f'S3 client initialized with endpoint: {AWS_CONFIG["endpoint_url"]}')
@@ -74,22 +106,16 @@ def globals_initialize():
     logger.info(f'AWS_ENDPOINT_URL: {AWS_CONFIG["endpoint_url"]}')
 
     #APP_QUEUE = CordGuardQueue(maxsize=20)
-     
-    try:
-        # Create and run a new event loop for database initialization
-        # !DEPRECATED
-        # loop = asyncio.new_event_loop()
-        # asyncio.set_event_loop(loop)
-        # DATABASE = loop.run_until_complete(CordGuardDatabase.create())
-        # loop.close()
-        # logger.info('Database initialized')
-        pass
-    except Exception as e:
-        logger.error(f"Failed to initialize DB: {e}", exc_info=True)
-        raise  # Re-raise the exception to prevent partial initialization
-
-    
+
+    # The database is not opened here: its connections belong to the server's event loop, so
+    # cordguard_database.init_db_pool() opens them from the app lifespan instead of a throwaway loop
+
     _initialized = True
     logger.info('CordGuard Globals initialized')
 
-globals_initialize()
\ No newline at end of file
+def __getattr__(name):
+    """Initialize the S3 globals on first access to any of them."""
+    if name in _LAZY_GLOBALS:
+        globals_initialize()
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
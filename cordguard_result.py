@@ -10,18 +10,18 @@ Key Components:
 - Result Storage: Stores analysis and mission IDs
 - Malware Details: Tracks malware type, webhook info, and build characteristics
 - Serialization: Methods for dict conversion and reconstruction
-- Property Management: Setters for all result attributes
 
 Author: v0id_user <contact@v0id.me>
 Security Contact: CordGuard Security Team <security@cordguard.org>
 Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
-from pydantic import BaseModel
+from dataclasses import dataclass
 import logging
 
-# For FastAPI
-class CordguardResult(BaseModel):
+# FastAPI validates request bodies against dataclasses too, so pydantic is only involved at the HTTP boundary
+@dataclass(slots=True)
+class CordguardResult:
     """
     Class for storing and managing malware analysis results.
     
@@ -53,126 +53,24 @@ class CordguardResult(BaseModel):
     is_upx_packed: bool = False
     python_version: str = ""
 
-    def init(self, analysis_id: str, mission_id: str, signed_hwid: str):
-        """
-        Initialize a new CordguardResult instance.
-
-        Args:
-            analysis_id (str): Unique ID for the analysis run
-            mission_id (str): Associated mission ID
-            signed_hwid (str): Signed HWID
-        """
-        self.analysis_id = analysis_id
-        self.mission_id = mission_id
-        self.signed_hwid = signed_hwid
-        logging.info(f'Initialized CordguardResult with analysis_id: {analysis_id}, mission_id: {mission_id}, signed_hwid: {signed_hwid}')
-    
-    @staticmethod
-    def from_dict(data: dict):
+    @classmethod
+    def from_dict(cls, data: dict):
         """
         Create a CordguardResult instance from a dictionary.
 
+        Keys that are not result fields (e.g. record metadata) are ignored, missing ones keep their defaults.
+
         Args:
             data (dict): Dictionary containing result data
 
         Returns:
             CordguardResult: New instance populated with dict data
         """
-        result = CordguardResult()
-        result.analysis_id = data['analysis_id']
-        result.mission_id = data['mission_id']
-        result.type = data['type']
-        result.webhook = data['webhook']
-        result.is_valid_webhook = data['is_valid_webhook']
-        result.is_pyinstaller = data['is_pyinstaller']
-        result.pyinstaller_version = data['pyinstaller_version']
-        result.is_upx_packed = data['is_upx_packed']
-        result.python_version = data['python_version']
-        result.signed_hwid = data['signed_hwid']
-        result.status = data['status']
-        logging.info(f'Created CordguardResult from dict: {result.get_dict()}')
+        fields = cls.__dataclass_fields__
+        result = cls(**{key: value for key, value in data.items() if key in fields})
+        logging.debug('Created CordguardResult from dict for analysis_id: %s', result.analysis_id)
         return result
 
-    def set_type_of_stealer(self, type: str):
-        """
-        Set the type of malware stealer detected.
-
-        Args:
-            type (str): Type of stealer malware
-        """
-        self.type = type
-        logging.info(f'Set type of stealer to: {type}')
-
-    def set_webhook(self, webhook: str):
-        """
-        Set the detected webhook URL.
-
-        Args:
-            webhook (str): Webhook URL found in malware
-        """
-        self.webhook = webhook
-        logging.info(f'Set webhook to: {webhook}')
-    
-    def set_is_valid_webhook(self, is_valid: bool):
-        """
-        Set whether the detected webhook is valid.
-
-        Args:
-            is_valid (bool): Webhook validity status
-        """
-        self.is_valid_webhook = is_valid
-        logging.info(f'Set is_valid_webhook to: {is_valid}')
-    
-    def set_is_it_pyinstaller(self, is_pyinstaller: bool):
-        """
-        Set whether the malware was built with PyInstaller.
-
-        Args:
-            is_pyinstaller (bool): PyInstaller usage status
-        """
-        self.is_pyinstaller = is_pyinstaller
-        logging.info(f'Set is_pyinstaller to: {is_pyinstaller}')
-
-    def set_pyinstaller_version(self, version: str):
-        """
-        Set the detected PyInstaller version.
-
-        Args:
-            version (str): PyInstaller version string
-        """
-        self.pyinstaller_version = version
-        logging.info(f'Set pyinstaller_version to: {version}')
-    
-    def set_is_upx_packed(self, is_upx_packed: bool):
-        """
-        Set whether the malware is UPX packed.
-
-        Args:
-            is_upx_packed (bool): UPX packing status
-        """
-        self.is_upx_packed = is_upx_packed
-        logging.info(f'Set is_upx_packed to: {is_upx_packed}')
-
-    def set_python_version(self, version: str):
-        """
-        Set the Python version used to build the malware.
-
-        Args:
-            version (str): Python version string
-        """
-        self.python_version = version
-        logging.info(f'Set python_version to: {version}')
-    
-    def set_status(self, status: str):
-        """
-        Set the status of the result.
-
-        Args:
-            status (str): Status of the result
-        """
-        self.status = status
-        logging.info(f'Set status to: {status}')
-
     def get_dict(self):
         """
         Convert the result object to a dictionary.
@@ -193,5 +91,5 @@ class CordguardResult(BaseModel):
             "python_version": self.python_version,
             "signed_hwid": self.signed_hwid
         }
-        logging.info(f'Converted result to dict: {result_dict}')
+        logging.debug('Converted result to dict: %s', result_dict)
         return result_dict
\ No newline at end of file
@@ -14,8 +14,12 @@ The utilities in this module focus on secure file operations by implementing:
 
 Key Functions:
     safe_read_file(): Read files safely with size limits
+    safe_file_size(): Validate the size of a seekable file without reading it
     safe_filename(): Sanitize filenames for secure storage
 
+Key Classes:
+    LRUCache: Bounded in-process cache with optional time-to-live
+
 Dependencies:
     werkzeug.utils: For secure filename handling
     logging: For operation logging
@@ -37,19 +41,27 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 
+import hmac
 import logging
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from werkzeug.utils import secure_filename
 from fastapi import Request
 
-logging.basicConfig(level=logging.INFO)
+# Largest sample accepted for analysis, whichever way it is uploaded
+MAX_FILE_SIZE = 25 * 1024 * 1024
 
-def safe_read_file(file, max_size=25 * 1024 * 1024) -> bytes | None:
+def safe_read_file(file, max_size=MAX_FILE_SIZE) -> bytes | None:
     """
     Safely read a file in chunks to prevent memory issues.
     
-    This function reads a file in chunks and enforces a maximum file size limit.
+    This function reads a file and enforces a maximum file size limit.
     It's designed to handle potentially large file uploads securely by:
-    - Reading the file in smaller chunks (20% of max_size)
+    - Checking the size of seekable files (e.g. spooled uploads) before reading a single byte,
+      then reading them with one exactly-sized read
+    - Reading other streams in smaller chunks (20% of max_size)
     - Enforcing a total size limit
     - Returning None if file exceeds size limit
     
@@ -58,7 +70,7 @@ def safe_read_file(file, max_size=25 * 1024 * 1024) -> bytes | None:
         max_size (int): Maximum allowed file size in bytes, defaults to 25MB
         
     Returns:
-        bytearray: The complete file contents if within size limit
+        bytes: The complete file contents if within size limit
         None: If file exceeds max_size limit
         
     Example:
@@ -66,26 +78,73 @@ def safe_read_file(file, max_size=25 * 1024 * 1024) -> bytes | None:
         >>> if content is None:
         >>>     print("File too large")
     """
-    content = bytearray()
+    try:
+        start = file.tell()
+        size = file.seek(0, os.SEEK_END) - start
+        file.seek(start)
+    except (AttributeError, OSError, ValueError):
+        size = None
+
+    if size is not None:
+        if size == 0:
+            logging.error('File is empty')
+            return None
+        if size > max_size:
+            logging.error('File too large uploaded')
+            return None
+        # A single read of the known size allocates the result once, with no intermediate buffers
+        content = file.read(size)
+        logging.info('File read successfully, total size: %d bytes.', len(content))
+        return content
+
+    # Chunks are joined once at the end: a single copy, where growing a bytearray and
+    # converting it to bytes copied everything twice (plus the reallocations)
+    chunks = []
     chunk_size = int(max_size * 0.2)  # 20% of the max size
-    logging.info('Starting to read file in chunks.')
     size = 0
     while True:
         chunk = file.read(chunk_size)
         if not chunk:
-            if size == 0:
-                logging.error('File is empty')
-                return None
-            logging.info('Finished reading file.')
             break
-        content.extend(chunk)
-        logging.debug(f'Read chunk of size: {len(chunk)} bytes.')
+        chunks.append(chunk)
         size += len(chunk)
         if size > max_size:
             logging.error('File too large uploaded')
             return None
+    if size == 0:
+        logging.error('File is empty')
+        return None
     logging.info('File read successfully, total size: %d bytes.', size)
-    return bytes(content)
+    return b''.join(chunks)
+
+def safe_file_size(file, max_size=MAX_FILE_SIZE) -> int | None:
+    """
+    Validate the size of a seekable file without reading any of it.
+
+    Used for spooled uploads, which are then streamed from the file object instead of being
+    loaded into memory. The file is left positioned at its start.
+
+    Args:
+        file: A seekable file-like object
+        max_size (int): Maximum allowed file size in bytes, defaults to 25MB
+
+    Returns:
+        int: The size of the file if within size limit
+        None: If the file is empty, exceeds max_size or is not seekable
+    """
+    try:
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+    except (AttributeError, OSError, ValueError):
+        logging.error('File is not seekable')
+        return None
+    if size == 0:
+        logging.error('File is empty')
+        return None
+    if size > max_size:
+        logging.error('File too large uploaded')
+        return None
+    return size
 
 
 def safe_filename(filename):
@@ -111,7 +170,7 @@ def safe_filename(filename):
         'my_file.txt'
     """
     sanitized_name = secure_filename(filename)
-    logging.info('Sanitized filename: %s', sanitized_name)
+    logging.debug('Sanitized filename: %s', sanitized_name)
     return sanitized_name
 
 
@@ -134,27 +193,124 @@ def extract_file_extension(filename):
         >>> extract_file_extension("archive.tar.gz")
         'tar.gz'
     """
-    parts = filename.split('.', 1)
-    if len(parts) > 1:
-        logging.info('Extracted file extension: %s', parts[1])
-        return '.' + parts[1]
+    # One scan and one slice that already includes the dot
+    dot = filename.find('.')
+    if dot >= 0:
+        return filename[dot:]
     logging.error('No file extension found for filename: %s', filename)
     raise ValueError('No file extension found')
 
 def does_file_have_extension(filename):
-    has_extension = '.' in filename
-    logging.debug('File %s has extension: %s', filename, has_extension)
-    return has_extension
-
-def is_sub_host(request: Request, sub_host: str = '') -> bool:
-    host = request.headers.get('host', '')
-    if not host:
-        logging.warning('No host found in request headers.')
-        return False
-    if sub_host == '':
+    return '.' in filename
+
+@lru_cache(maxsize=32)
+def _encode_host(host: str) -> bytes:
+    return host.encode('latin-1')
+
+def is_sub_host(request: Request, sub_host: str | bytes = '') -> bool:
+    """
+    Check whether the request's Host header starts with sub_host.
+
+    The raw ASGI header bytes are compared directly, so no header str is decoded per request.
+
+    Args:
+        request (Request): The incoming request
+        sub_host (str | bytes): Expected host prefix, e.g. 'ai.'; pass bytes to skip the (cached) encoding
+
+    Returns:
+        bool: True if the host starts with sub_host; False when either is missing
+    """
+    if not sub_host:
         logging.warning('No sub_host provided for comparison.')
         return False
-    
-    result = host.startswith(sub_host)
-    logging.debug('Host %s starts with sub_host %s: %s', host, sub_host, result)
-    return result
+    if isinstance(sub_host, str):
+        sub_host = _encode_host(sub_host)
+    # ASGI servers lowercase header names, and Host is sent once
+    for name, value in request.scope['headers']:
+        if name == b'host':
+            return value.startswith(sub_host)
+    logging.warning('No host found in request headers.')
+    return False
+
+def is_valid_api_key(request: Request, api_key: bytes) -> bool:
+    """
+    Check the request's x-api-key header against the expected key in constant time.
+
+    Args:
+        request (Request): The incoming request
+        api_key (bytes): The expected key, encoded once by the caller
+
+    Returns:
+        bool: True if the header matches; always False when no key is configured
+    """
+    if not api_key:
+        logging.warning('No API key configured, rejecting request.')
+        return False
+    return hmac.compare_digest(request.headers.get('x-api-key', '').encode(), api_key)
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction and optional expiry.
+
+    Entries are kept per process, so with several server workers each one holds its own copy.
+    Intended for the single-threaded event loop; it does no locking of its own.
+
+    Attributes:
+        maxsize (int): Maximum number of entries before the least recently used one is evicted
+        ttl (float | None): Default lifetime of an entry in seconds, None to never expire
+
+    Example:
+        >>> cache = LRUCache(maxsize=2, ttl=30)
+        >>> cache.set('a', 1)
+        >>> cache.get('a')
+        1
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        """
+        Store value under key, evicting the least recently used entry when full.
+
+        Args:
+            key: Hashable cache key
+            value: Value to store
+            ttl (float | None): Lifetime override in seconds for this entry
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Remove key from the cache and return its value, or default if it was not cached.
+        """
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -14,8 +14,6 @@ Version: 1.0.0
 """
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CordguardWorkerStatus:
@@ -24,44 +22,77 @@ class CordguardWorkerStatus:
 
     NOT_ACQUIRED: Worker is not acquired by any mission
     ACQUIRED: Worker is acquired by a mission
+
+    Statuses are ints, compared in one machine-word operation; they are stored as the
+    is_acquired bool and only turned into names for display.
     """
-    NOT_ACQUIRED = 'not_acquired'
-    ACQUIRED = 'acquired'
+    NOT_ACQUIRED = 0
+    ACQUIRED = 1
+
+    NAMES = ('not_acquired', 'acquired')
 
 class CordguardWorker:
     """
     Class representing a VM worker JSON schema
     """
+    __slots__ = ('hwid', 'public_ip', '_is_signed', 'signed_hwid', '_status', '_dict_cache', '_signed_hwid_bytes')
+
     def __init__(self, hwid: str, signed_hwid: str, public_ip: str, is_signed: bool, status: CordguardWorkerStatus):
+        self._dict_cache = None
+        self._signed_hwid_bytes = None
         self.hwid = hwid
         self.public_ip = public_ip
         self.is_signed = is_signed
         self.signed_hwid = signed_hwid
         self.status = status
-        logger.info(f'Initialized CordguardWorker: hwid={self.hwid}, public_ip={self.public_ip}, is_signed={self.is_signed}, status={self.status}')
+        logger.debug('Initialized CordguardWorker: hwid=%s, public_ip=%s, is_signed=%s, status=%s', self.hwid, self.public_ip, self.is_signed, CordguardWorkerStatus.NAMES[status])
     
     # @staticmethod
     # def from_dict(data: dict) -> 'CordguardWorker':
     #     return CordguardWorker(hwid=data['hwid'], signed_hwid=data['signed_hwid'], public_ip=data['public_ip'], is_signed=data['is_signed'], status= CordguardWorkerStatus.ACQUIRED if data['is_acquired'] else CordguardWorkerStatus.NOT_ACQUIRED)
     
+    # is_signed and status are the only fields changed after construction, so they drop the cached dict
+    @property
+    def is_signed(self) -> bool:
+        return self._is_signed
+
+    @is_signed.setter
+    def is_signed(self, value: bool):
+        self._is_signed = value
+        self._dict_cache = None
+
+    @property
+    def status(self) -> CordguardWorkerStatus:
+        return self._status
+
+    @status.setter
+    def status(self, value: CordguardWorkerStatus):
+        self._status = value
+        self._dict_cache = None
+
+    @property
+    def signed_hwid_bytes(self) -> bytes:
+        """The signed HWID decoded from hex, for signature checks; decoded once per worker"""
+        if self._signed_hwid_bytes is None:
+            self._signed_hwid_bytes = bytes.fromhex(self.signed_hwid)
+        return self._signed_hwid_bytes
+
     def __str__(self):
-        worker_str = f'CordguardWorker: {self.hwid} - {self.public_ip} - {self.is_signed} - {self.status}'
-        logger.debug(f'String representation of worker: {worker_str}')
-        return worker_str
+        return f'CordguardWorker: {self.hwid} - {self.public_ip} - {self.is_signed} - {CordguardWorkerStatus.NAMES[self._status]}'
     
     def is_acquired(self):
-        acquired = self.status == CordguardWorkerStatus.ACQUIRED
-        logger.debug(f'Worker {self.hwid} acquired status: {acquired}')
-        return acquired
+        return self._status == CordguardWorkerStatus.ACQUIRED
 
     def set_acquired(self, status: bool):
         self.status = CordguardWorkerStatus.ACQUIRED if status else CordguardWorkerStatus.NOT_ACQUIRED
-        logger.info(f'Set acquired status for worker {self.hwid} to: {self.status}')
+        logger.info('Set acquired status for worker %s to: %s', self.hwid, CordguardWorkerStatus.NAMES[self._status])
 
     def get_dict(self):
         """
         Get a dictionary representation of the worker
 
+        The dict is built once and reused until is_signed or status changes, so callers must not modify it.
+
         Returns:
             dict: A dictionary representation of the worker
             {
@@ -72,12 +103,12 @@ class CordguardWorker:
                 "is_acquired": bool
             }
         """
-        worker_dict = {
-            "hwid": self.hwid,
-            "public_ip": self.public_ip,
-            "is_signed": self.is_signed,
-            "signed_hwid": self.signed_hwid,
-            "is_acquired": self.is_acquired(),
-        }
-        logger.debug(f'Worker dictionary representation: {worker_dict}')
-        return worker_dict
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "hwid": self.hwid,
+                "public_ip": self.public_ip,
+                "is_signed": self._is_signed,
+                "signed_hwid": self.signed_hwid,
+                "is_acquired": self.is_acquired(),
+            }
+        return self._dict_cache
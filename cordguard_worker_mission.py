@@ -8,7 +8,7 @@ Classes:
 
 Dependencies:
     cordguard_worker: Worker management models
-    cordguard_file: File handling models 
+    cordguard_database: Analysis and file record models (type checking only)
     cordguard_codes: ID generation utilities
 
 Usage:
@@ -22,20 +22,15 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 import logging
+from typing import TYPE_CHECKING
 from cordguard_worker import CordguardWorker
-from cordguard_file import CordGuardAnalysisFile 
 
 from cordguard_codes import create_trackable_id
 
-# from cordguard_database import CordGuardAnalysisRecord, CordGuardFileRecord
-#TODO: Lazy solution to avoid circular import issues, fix later by moving types of records to a separate file
-class CordGuardAnalysisRecord:
-    pass
-class CordGuardFileRecord:
-    pass
+if TYPE_CHECKING:
+    # cordguard_database imports this module, so the record types are only imported for type checkers
+    from cordguard_database import CordGuardAnalysisRecord, CordGuardFileRecord
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CordguardWorkerMission:
@@ -47,19 +42,23 @@ class CordguardWorkerMission:
     Attributes:
         mission_id (str): Unique identifier for this mission
         worker (CordguardWorker): The worker assigned to this mission
-        analysis (CordGuardAnalysisFile): The analysis task to be performed
+        analysis (CordGuardAnalysisRecord): The analysis task to be performed
 
     Args:
         worker (CordguardWorker): Worker to assign the mission to
-        analysis (CordGuardAnalysisFile): Analysis task for the mission
+        analysis (CordGuardAnalysisRecord): Analysis task for the mission
+        file (CordGuardFileRecord): File the analysis is about
+        mission_id (str, optional): Existing mission ID, a new one is generated if omitted
     """
+    __slots__ = ('mission_id', 'worker', 'analysis', 'file')
     
-    def __init__(self, worker: CordguardWorker, analysis: CordGuardAnalysisRecord, file: CordGuardFileRecord, mission_id: str = create_trackable_id()):
-        self.mission_id = mission_id
+    def __init__(self, worker: CordguardWorker, analysis: 'CordGuardAnalysisRecord', file: 'CordGuardFileRecord', mission_id: str | None = None):
+        # Generated per call; a create_trackable_id() default would be evaluated once and shared by every mission
+        self.mission_id = create_trackable_id() if mission_id is None else mission_id
         self.worker = worker
         self.analysis = analysis
         self.file = file
-        logger.info(f'Initialized CordguardWorkerMission with mission_id: {self.mission_id}')
+        logger.info('Initialized CordguardWorkerMission with mission_id: %s', self.mission_id)
 
     def __str__(self) -> str:
         return f'CordguardWorkerMission(mission_id={self.mission_id}, worker={self.worker}, analysis={self.analysis})'
@@ -83,14 +82,12 @@ class CordguardWorkerMission:
             >>> print(mission_dict['mission_id'])
             'mission_abc123'
         """
-        mission_dict = {
+        return {
             'mission_id': self.mission_id,
             'worker': self.worker.get_dict(),
             'analysis': self.analysis.get_dict(),
             'file': self.file.get_dict()
         }
-        logger.info(f'Converted mission to dictionary: {mission_dict}')
-        return mission_dict
 
     def get_mission_response(self):
         """
@@ -112,5 +109,5 @@ class CordguardWorkerMission:
                 'file_full_url': self.file.file_full_url,
                 'analysis_id': self.analysis.analysis_id
             }
-        logger.info(f'Generated mission response: {response}')
+        logger.debug('Generated mission response: %s', response)
         return response
\ No newline at end of file
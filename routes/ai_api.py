@@ -1,62 +1,86 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import logging
-from cordguard_database import CordGuardAnalysisStatus, CordGuardDatabase
-from cordguard_ai import OpenAIMaliciousTextDetector
-from cordguard_utils import is_sub_host
+from cordguard_database import CordGuardAnalysisStatus, CordGuardDatabase, get_db
+from cordguard_ai import MAX_TEXT_CHARS, MAX_TEXT_TOKENS, OpenAIMaliciousTextDetector, TextTooLargeError
+from cordguard_utils import is_sub_host, is_valid_api_key
 import os
+import asyncio
+from functools import cache
 
-logging.basicConfig(level=logging.INFO)
+# Set on the router too, so the AI responses are orjson-encoded wherever the router is mounted
+ai_api_endpoint_router = APIRouter(prefix="/ai/api", tags=["ai"], default_response_class=ORJSONResponse)
 
-ai_api_endpoint_router = APIRouter(prefix="/ai/api", tags=["ai"])
-HARDCODED_MAX_TOKENS = 64800
+# AI API access settings, read once instead of on every request
+DEBUG = os.getenv('DEBUG') == 'true'
+AI_API_HOST = os.getenv('AI_API_HOST', 'ai.').encode()
+AI_API_KEY = os.getenv('AI_API_KEY', '').encode()
 
 class AIDetectRequest(BaseModel):
     text: str
     signed_hwid: str
     analysis_id: str
 
+@cache
+def _get_detector() -> OpenAIMaliciousTextDetector:
+    """
+    Return the detector shared by every request, created on first use.
+
+    Creation raises when OPENAI_API_KEY or the prompt is missing; nothing is cached then, so the next request retries.
+    """
+    return OpenAIMaliciousTextDetector(auto_model=True)
+
+async def _save_ai_response(db: CordGuardDatabase, analysis_id: str, text: str, response: dict) -> None:
+    """
+    Persist a detection after its response has been sent; failures are only logged since the client already has the result.
+    """
+    try:
+        if await db.save_ai_response(analysis_id, text, response):
+            logging.info("AI response saved for analysis_id: %s", analysis_id)
+        else:
+            logging.error("Failed to save AI response for analysis_id: %s", analysis_id)
+    except Exception as e:
+        logging.error("Failed to save AI response for analysis_id: %s: %s", analysis_id, e)
+
 @ai_api_endpoint_router.post("/detect")
-async def detect(request: AIDetectRequest, full_request: Request = None):
+async def detect(request: AIDetectRequest, background_tasks: BackgroundTasks, full_request: Request = None,
+                 db: CordGuardDatabase = Depends(get_db)):
     logging.info("Received detection request for analysis_id: %s", request.analysis_id)
-    
-    # Create the database instance
-    db: CordGuardDatabase = await CordGuardDatabase.create()
-    logging.info("Database instance created.")
 
-    if os.getenv('DEBUG') == 'true':
+    # Header checks first, so rejected requests never touch the database
+    if DEBUG:
         logging.info('DEBUG is true, skipping host check')
     else:
-        if not is_sub_host(full_request, os.getenv('AI_API_HOST', 'ai.')):
+        if not is_sub_host(full_request, AI_API_HOST):
             logging.warning("Unauthorized access attempt from host: %s", full_request.client.host)
             raise HTTPException(status_code=403, detail="AI API only allowed through AI subdomain")
         
-        if full_request.headers.get('x-api-key') != os.getenv('AI_API_KEY'):
+        if not is_valid_api_key(full_request, AI_API_KEY):
             logging.warning("Invalid API key provided.")
             raise HTTPException(status_code=403, detail="Invalid AI API key")
 
+    # The token budget is a length check, so it runs before any database round trip.
+    # It is the detector's own limit, so no text reaching detect() is refused there.
+    if len(request.text) > MAX_TEXT_CHARS:
+        logging.error("Text is too long - exceeds %d tokens", MAX_TEXT_TOKENS)
+        raise HTTPException(status_code=400, detail=f"Text is too long - exceeds {MAX_TEXT_TOKENS} tokens")
+
     # Is it already in the database?
     ai_response = await db.get_ai_response_by_analysis_id(request.analysis_id)
     if ai_response is not None:
         logging.info("AI response found in database for analysis_id: %s", request.analysis_id)
         return ai_response.get_dict()
     
-    # Estimate tokens using rough 4 chars/token ratio for GPT models
-    estimated_tokens = len(request.text) // 4
-    logging.info("Estimated tokens for the request: %d", estimated_tokens)
-    
-    if estimated_tokens > HARDCODED_MAX_TOKENS:
-        logging.error(f"Text is too long - exceeds {HARDCODED_MAX_TOKENS} tokens")
-        raise HTTPException(status_code=400, detail=f"Text is too long - exceeds {HARDCODED_MAX_TOKENS} tokens")
-    
-    # Get machine from signed_hwid
-    machine = await db.get_worker_by_signed_hwid(request.signed_hwid)
+    # The machine and the analysis record are independent lookups, so they share one round trip
+    machine, analysis_record = await asyncio.gather(
+        db.get_worker_by_signed_hwid(request.signed_hwid),
+        db.get_analysis_record_by_analysis_id(request.analysis_id)
+    )
     if machine is None:
         logging.error("Machine not found for signed_hwid: %s", request.signed_hwid)
         raise HTTPException(status_code=404, detail="Machine not found")
 
-    # Get the analysis record
-    analysis_record = await db.get_analysis_record_by_analysis_id(request.analysis_id)
     if analysis_record is None:
         logging.error("Analysis record not found for analysis_id: %s", request.analysis_id)
         raise HTTPException(status_code=404, detail="Analysis record not found")
@@ -66,8 +90,12 @@ async def detect(request: AIDetectRequest, full_request: Request = None):
         logging.error("Analysis is not analyzing for analysis_id: %s", request.analysis_id)
         raise HTTPException(status_code=400, detail="Analysis is not analyzing")
     
-    detector = OpenAIMaliciousTextDetector(auto_model=True)
-    response = detector.detect(request.text)
-    await db.save_ai_response(request.analysis_id, request.text, response.get_dict())
-    logging.info("AI response saved for analysis_id: %s", request.analysis_id)
-    return response.get_dict()
\ No newline at end of file
+    try:
+        response = await _get_detector().detect(request.text)
+    except TextTooLargeError:
+        # Never answered or stored as a clean verdict
+        raise HTTPException(status_code=400, detail=f"Text is too long - exceeds {MAX_TEXT_TOKENS} tokens")
+    response_dict = response.get_dict()
+    # The write does not change the answer, so it runs after the response is sent
+    background_tasks.add_task(_save_ai_response, db, request.analysis_id, request.text, response_dict)
+    return response_dict
\ No newline at end of file
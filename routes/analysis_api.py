@@ -7,6 +7,8 @@ It handles file uploads and status checks for malware analysis operations.
 Routes:
     /status/{analysis_id} (GET): Check status of an analysis
     /upload (POST): Upload a file for analysis
+    /upload-session (POST): Get pre-signed S3 URLs to upload a file directly to storage
+    /upload-session/complete (POST): Queue a file uploaded through an upload session
 
 The router integrates with S3 for file storage and maintains an analysis queue
 for processing uploaded files asynchronously.
@@ -17,22 +19,117 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 import logging
-from cordguard_globals import BUCKET_NAME_S3
-from cordguard_utils import safe_read_file, safe_filename, does_file_have_extension
-from cordguard_file import CordGuardAnalysisFile
+import cordguard_globals
+from cordguard_utils import safe_file_size, safe_filename, MAX_FILE_SIZE
+from cordguard_file import CordGuardAnalysisFile, hash_file_object
+from cordguard_codes import extract_timestamp_from_trackable_id
 import puremagic
-from cordguard_database import CordGuardDatabase
+from cordguard_database import CordGuardDatabase, get_db
 from cordguard_database import CordGuardAnalysisStatus # TODO: This(CordGuardAnalysisStatus) should not be here, but i'm lazy to move it :P (#V0ID)
-from cordguard_utils import is_sub_host
+from cordguard_utils import is_sub_host, is_valid_api_key, LRUCache
+import asyncio
 import os
-logging.basicConfig(level=logging.INFO)
+import re
+import time
+from pydantic import BaseModel
+# Set on the router too, so the responses are orjson-encoded wherever the router is mounted
+analysis_api_endpoint_router = APIRouter(prefix="/analysis/api", tags=["analysis"], default_response_class=ORJSONResponse)
 
-analysis_api_endpoint_router = APIRouter(prefix="/analysis/api", tags=["analysis"])
+# Define accepted file extensions, a set so the check is one hash lookup of the lowercased suffix
+ACCEPTED_FILE_EXTENSIONS = frozenset({
+    # Scripts
+    '.py', '.sh', '.bat', '.ps1', '.psm1', '.psd1', '.vbs', '.js', '.ts',
+    # Windows executables and libraries  
+    '.exe', '.dll', '.com',
+    # Windows scripting
+    '.vb', '.cmd', '.jse', '.ws', '.wsf', '.wsc', '.wsh',
+    # PowerShell specific
+    '.msh', '.msh1', '.msh2', '.msh1xml', '.msh2xml',
+    '.msh1script', '.msh2script', '.msh1xmlscript', '.msh2xmlscript',
+    '.msh1xmlsc', '.msh2xmlsc', '.msh1xmlsrc', '.msh2xmlsrc',
+    '.msh1xmlsrcsc', '.msh2xmlsrcsc'
+})
+
+# Analysis API access settings, read once instead of on every request
+DEBUG = os.getenv('DEBUG') == 'true'
+USERS_HOST = os.getenv('USERS_HOST', 'u.').encode()
+ANALYSIS_HOST = os.getenv('ANALYSIS_HOST', 'analysis.').encode()
+ANALYSIS_API_KEY = os.getenv('ANALYSIS_API_KEY', '').encode()
+
+# Part size handed to upload-session clients; S3 requires at least 5MB for every part but the last
+UPLOAD_SESSION_PART_SIZE = 8 * 1024 * 1024
+# Seconds the pre-signed part URLs of an upload session stay valid, so how long it can take to complete
+UPLOAD_SESSION_TTL = 3600
+
+# Shapes of the IDs a client echoes back when completing an upload session
+ANALYSIS_ID_PATTERN = re.compile(r'cordguard_[0-9a-f]{10}[0-9]+_[0-9a-f]+')
+FILE_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+# /status responses of analyses in a terminal state (completed or failed), which never change again.
+# Clients poll /status, so a finished analysis is answered without its three lookups.
+STATUS_CACHE_TTL = 3600
+_status_cache = LRUCache(maxsize=10_000, ttl=STATUS_CACHE_TTL)
+
+# Unknown analysis IDs are remembered briefly, so a client polling a bogus ID costs one lookup per window.
+# /upload-session hands out analysis IDs before their record exists, so IDs that may still belong to
+# an open session are never remembered (see _may_be_pending_upload).
+MISSING_ANALYSIS_CACHE_TTL = 5
+_missing_analysis_cache = LRUCache(maxsize=10_000, ttl=MISSING_ANALYSIS_CACHE_TTL)
+
+class UploadSessionRequest(BaseModel):
+    file_name: str
+    file_size: int
+
+class UploadSessionPart(BaseModel):
+    part_number: int
+    etag: str
+
+class UploadSessionComplete(BaseModel):
+    upload_id: str
+    analysis_id: str
+    file_id: str
+    timestamp: int
+    file_name: str
+    parts: list[UploadSessionPart]
+
+def file_extension(filename: str) -> str:
+    """Return the lowercased last extension of filename including its dot, or '' if it has none."""
+    return os.path.splitext(filename)[1].lower()
+
+def _may_be_pending_upload(analysis_id: str) -> bool:
+    """Whether analysis_id is shaped like an issued ID recent enough for its upload session to still be completed."""
+    if not ANALYSIS_ID_PATTERN.fullmatch(analysis_id):
+        return False
+    try:
+        issued_at = extract_timestamp_from_trackable_id(analysis_id).timestamp()
+    except (ValueError, OverflowError, OSError):
+        # Timestamp out of range, so not an ID this service issued
+        return False
+    return time.time() - issued_at < UPLOAD_SESSION_TTL
+
+def check_users_host(request: Request):
+    """
+    Reject requests that did not come through the public users subdomain.
+
+    Raises:
+        HTTPException: 403 if the host does not match USERS_HOST
+    """
+    if DEBUG:
+        logging.info('DEBUG is true, skipping host check')
+        return
+    # 'u.' subdomain because it's public.
+    if not is_sub_host(request, USERS_HOST):
+        logging.warning("Unauthorized file upload attempt from host: %s", request.client.host)
+        raise HTTPException(
+            status_code=403, 
+            detail="File upload only allowed through analysis subdomain"
+        )
 
 @analysis_api_endpoint_router.get("/status/{analysis_id}")
-async def status(analysis_id: str, request: Request = None):
+async def status(analysis_id: str, request: Request = None, db: CordGuardDatabase = Depends(get_db)):
     """
     Get the status of a file analysis.
 
@@ -42,23 +139,33 @@ async def status(analysis_id: str, request: Request = None):
     Returns:
         dict: Analysis status information
     """
-    logging.info(f"Received status request for analysis_id: {analysis_id}")
-    db: CordGuardDatabase = await CordGuardDatabase.create()
+    logging.debug("Received status request for analysis_id: %s", analysis_id)
 
-    if os.getenv('DEBUG') == 'true':
+    if DEBUG:
         logging.info('DEBUG is true, skipping host check')
     else:
-        if not is_sub_host(request, os.getenv('ANALYSIS_HOST', 'analysis.')):
+        if not is_sub_host(request, ANALYSIS_HOST):
             logging.warning("Unauthorized access attempt for analysis_id: %s", analysis_id)
             raise HTTPException(status_code=403, detail="Analysis API only allowed through API subdomain")
         
-        if request.headers.get('x-api-key') != os.getenv('ANALYSIS_API_KEY'):
+        if not is_valid_api_key(request, ANALYSIS_API_KEY):
             logging.warning("Invalid API key provided for analysis_id: %s", analysis_id)
             raise HTTPException(status_code=403, detail="Invalid Analysis API key")
 
-    analysis_record = await db.get_analysis_record_by_analysis_id(analysis_id)
+    cached_response = _status_cache.get(analysis_id)
+    if cached_response is not None:
+        logging.info("Returning cached status for analysis_id: %s", analysis_id)
+        return cached_response
+    if _missing_analysis_cache.get(analysis_id):
+        logging.info("Analysis record recently not found for analysis_id: %s", analysis_id)
+        raise HTTPException(status_code=404, detail="Analysis record not found")
+
+    # Batched with the lookups of concurrent polls
+    analysis_record = await db.load_analysis_record(analysis_id)
     if analysis_record is None:
         logging.error("Analysis record not found for analysis_id: %s", analysis_id)
+        if not _may_be_pending_upload(analysis_id):
+            _missing_analysis_cache.set(analysis_id, True)
         raise HTTPException(status_code=404, detail="Analysis record not found")
     
     logging.info("Found analysis record for analysis_id: %s with status: %s", analysis_id, analysis_record.status)
@@ -72,29 +179,31 @@ async def status(analysis_id: str, request: Request = None):
         }
     elif analysis_record.status == CordGuardAnalysisStatus.FAILED:
         logging.warning("Analysis failed for analysis_id: %s", analysis_id)
-        return {
+        response = {
             "message": "Analysis failed, request the operator to check the file please.\nGive them the following analysis_id: " + analysis_id,
             "analysis_id": analysis_id,
             "status": analysis_record.status
         }
+        _status_cache.set(analysis_id, response)
+        return response
     elif analysis_record.status == CordGuardAnalysisStatus.COMPLETED:
         logging.info("Analysis completed for analysis_id: %s", analysis_id)
-        # Get results from database and form it correctly
-        results = await db.get_analysis_results_by_analysis_id(analysis_id)
+        # Results, file data and AI response are independent lookups, so they share one round trip
+        results, file_record, ai_response_record = await asyncio.gather(
+            db.get_analysis_results_by_analysis_id(analysis_id),
+            db.get_file_record_by_file_hash(analysis_record.file_hash),
+            db.get_ai_response_by_analysis_id(analysis_id)
+        )
         if results is None:
             logging.error("Analysis results not found for analysis_id: %s", analysis_id)
             raise HTTPException(status_code=500, detail="Analysis results not found. Internal error.")
-        # File data
-        file_record = await db.get_file_record_by_file_hash(analysis_record.file_hash)
         if file_record is None:
             logging.error("File record not found for file_hash: %s", analysis_record.file_hash)
             raise HTTPException(status_code=500, detail="File record not found. Internal error.")
-        # AI response
-        ai_response_record = await db.get_ai_response_by_analysis_id(analysis_id)
         if ai_response_record is None:
             logging.error("AI response not found for analysis_id: %s", analysis_id)
             raise HTTPException(status_code=500, detail="AI response not found. Internal error.")
-        return {
+        response = {
             "message": "Analysis successful",
             "analysis_id": analysis_id,
             "status": analysis_record.status,
@@ -102,12 +211,14 @@ async def status(analysis_id: str, request: Request = None):
             "file_data": file_record.get_safe_dict(),
             "ai_response": ai_response_record.get_dict()
         }
+        _status_cache.set(analysis_id, response)
+        return response
     else:
         logging.error("Unknown analysis status for analysis_id: %s", analysis_id)
         raise HTTPException(status_code=500, detail="Unknown analysis status")
 
 @analysis_api_endpoint_router.post("/upload")
-async def upload(file: UploadFile = File(...), request: Request = None):
+async def upload(file: UploadFile = File(...), request: Request = None, db: CordGuardDatabase = Depends(get_db)):
     """
     Upload a file for malware analysis.
 
@@ -123,67 +234,48 @@ async def upload(file: UploadFile = File(...), request: Request = None):
     Raises:
         HTTPException: 
             400: Invalid file type or size
+            413: File larger than MAX_FILE_SIZE
             500: Server error (S3 upload failed)
     """
 
     # PUBLIC ENDPOINT FOR NOW.
     logging.info('File upload request received for file: %s', file.filename)
 
-    if os.getenv('DEBUG') == 'true':
-        logging.info('DEBUG is true, skipping host check')
-    else:
-        # 'u.' subdomain because it's public.
-        if not is_sub_host(request, os.getenv('USERS_HOST', 'u.')):
-            logging.warning("Unauthorized file upload attempt from host: %s", request.client.host)
-            raise HTTPException(
-                status_code=403, 
-                detail="File upload only allowed through analysis subdomain"
-            )
+    check_users_host(request)
     
     # No need for API key for now because it's public.
     # if request.headers.get('x-api-key') != os.getenv('ANALYSIS_API_KEY'):
     #     logging.warning("Invalid API key provided for file upload")
     #     raise HTTPException(status_code=403, detail="Invalid Analysis API key")
-    
-    # Define accepted file extensions
-    list_of_accepted_file_types = [
-        # Scripts
-        '.py', '.sh', '.bat', '.ps1', '.psm1', '.psd1', '.vbs', '.js', '.ts',
-        # Windows executables and libraries  
-        '.exe', '.dll', '.com',
-        # Windows scripting
-        '.vb', '.cmd', '.jse', '.ws', '.wsf', '.wsc', '.wsh',
-        # PowerShell specific
-        '.msh', '.msh1', '.msh2', '.msh1xml', '.msh2xml',
-        '.msh1script', '.msh2script', '.msh1xmlscript', '.msh2xmlscript',
-        '.msh1xmlsc', '.msh2xmlsc', '.msh1xmlsrc', '.msh2xmlsrc',
-        '.msh1xmlsrcsc', '.msh2xmlsrcsc'
-    ]
-    
-    # Validate file extension
-    if not file.filename.endswith(tuple(list_of_accepted_file_types)):
-        logging.error('Invalid file type uploaded: %s', file.filename)
-        raise HTTPException(status_code=400, detail="Invalid file type")
+
+    # Bodies whose Content-Length is over the limit never get here (BodySizeLimitMiddleware);
+    # the size Starlette counted while parsing also catches oversized parts of chunked bodies
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        logging.error('File too large uploaded: %s (%d bytes)', file.filename, file.size)
+        raise HTTPException(status_code=413, detail="File too large")
     
     # Sanitize filename
     filename = safe_filename(file.filename)
     logging.info('Sanitized filename: %s', filename)
 
-    if not does_file_have_extension(filename):
+    # Validate file extension
+    ext = file_extension(filename)
+    if not ext:
         logging.error('File has no extension, we are unable to process this file: %s', filename)
         raise HTTPException(status_code=400, detail="File has no extension, we are unable to process this file.")
+    if ext not in ACCEPTED_FILE_EXTENSIONS:
+        logging.error('Invalid file type uploaded: %s', file.filename)
+        raise HTTPException(status_code=400, detail="Invalid file type")
 
-    # Read and validate file content
-    content = safe_read_file(file.file)
-    if content is None:
+    # Validate the size of the spooled upload; the content is streamed from it and never loaded whole
+    file_size = safe_file_size(file.file)
+    if file_size is None:
         logging.error('File too large or empty: %s', filename)
         raise HTTPException(status_code=400, detail="File too large or empty")
-    
-    # TODO: This is a workaround to avoid the file being read multiple times
-    import io
-    byteio_file = io.BytesIO(content)
-    # Create analysis file object
-    magic_result = puremagic.magic_stream(byteio_file, filename)[0]
+
+    # puremagic only reads the head and the tail of the stream
+    magic_result = puremagic.magic_stream(file.file, filename)[0]
+    file.file.seek(0)
     mime_type = magic_result.mime_type
     logging.info('Detected MIME type: %s for file: %s', mime_type, filename)
 
@@ -193,11 +285,12 @@ async def upload(file: UploadFile = File(...), request: Request = None):
         logging.error('ELF files are not supported: %s', filename)
         raise HTTPException(status_code=400, detail="ELF files are not supported yet.")
 
-    file_obj = CordGuardAnalysisFile(filename, mime_type, len(content), content, bucket_name_s3=BUCKET_NAME_S3, s3_client=None)
+    file_obj = CordGuardAnalysisFile(filename, mime_type, file_size, bucket_name_s3=cordguard_globals.BUCKET_NAME_S3, s3_client=None, file_obj=file.file)
 
-    # Check the hash if file is already in the database
-    db: CordGuardDatabase = await CordGuardDatabase.create()
-    file_record = await db.get_file_record_by_file_hash(file_obj.file_hash)
+    # Check the hash if file is already in the database; hashing streams the file, so it runs on a worker thread
+    file_hash = await asyncio.to_thread(hash_file_object, file.file)
+    file_obj.file_hash = file_hash
+    file_record = await db.get_file_record_by_file_hash(file_hash)
     if file_record is not None:
         logging.info('File already in database with analysis_id: %s', file_record.analysis_id)
         return {
@@ -205,12 +298,12 @@ async def upload(file: UploadFile = File(...), request: Request = None):
             "analysis_id": file_record.analysis_id
         }
     
-    # Upload to S3
-    if not file_obj.upload_to_s3():
+    # Upload to S3 on a worker thread; boto3 is blocking and would otherwise stall the event loop
+    if not await asyncio.to_thread(file_obj.upload_to_s3):
         logging.error('Failed to upload file to S3: %s', filename)
         raise HTTPException(status_code=500, detail="Failed to upload file")
 
-    logging.info(f'File uploaded with analysis_id: {file_obj.analysis_id} and file_id: {file_obj.file_id}')
+    logging.info('File uploaded with analysis_id: %s and file_id: %s', file_obj.analysis_id, file_obj.file_id)
 
     # Create DATABASE record
     record = await db.new_analysis_for_file(file_obj)
@@ -223,3 +316,127 @@ async def upload(file: UploadFile = File(...), request: Request = None):
         "message": "File uploaded and queued for analysis",
         "analysis_id": file_obj.analysis_id
     }
+
+@analysis_api_endpoint_router.post("/upload-session")
+async def upload_session(session: UploadSessionRequest, request: Request = None):
+    """
+    Start a direct-to-S3 upload for a file.
+
+    Instead of streaming the file through the API, the client receives one pre-signed URL per
+    part, uploads the parts to S3 (concurrently if it likes) and then calls /upload-session/complete
+    with the ETag S3 returned for each part, echoing back the IDs of this response.
+
+    Args:
+        session (UploadSessionRequest): Name and size in bytes of the file to upload
+
+    Returns:
+        dict: upload_id, analysis_id, file_id, timestamp, file_name, part_size and the pre-signed parts
+
+    Raises:
+        HTTPException:
+            400: Invalid file type or size
+            500: Server error (S3 multipart upload could not be started)
+    """
+    logging.info('Upload session request received for file: %s', session.file_name)
+    check_users_host(request)
+
+    filename = safe_filename(session.file_name)
+    ext = file_extension(filename)
+    if not ext:
+        logging.error('File has no extension, we are unable to process this file: %s', filename)
+        raise HTTPException(status_code=400, detail="File has no extension, we are unable to process this file.")
+    if ext not in ACCEPTED_FILE_EXTENSIONS:
+        logging.error('Invalid file type for upload session: %s', session.file_name)
+        raise HTTPException(status_code=400, detail="Invalid file type")
+
+    if session.file_size <= 0 or session.file_size > MAX_FILE_SIZE:
+        logging.error('Invalid file size for upload session: %d', session.file_size)
+        raise HTTPException(status_code=400, detail="File too large or empty")
+
+    file_obj = CordGuardAnalysisFile(filename, "", session.file_size, b"", bucket_name_s3=cordguard_globals.BUCKET_NAME_S3, s3_client=None, file_hash="")
+    upload = await asyncio.to_thread(file_obj.start_multipart_upload, UPLOAD_SESSION_PART_SIZE, UPLOAD_SESSION_TTL)
+    if upload is None:
+        raise HTTPException(status_code=500, detail="Failed to start upload")
+
+    return {
+        "upload_id": upload['upload_id'],
+        "analysis_id": file_obj.analysis_id,
+        "file_id": file_obj.file_id,
+        "timestamp": file_obj.current_timestamp,
+        "file_name": filename,
+        "part_size": UPLOAD_SESSION_PART_SIZE,
+        "parts": upload['parts']
+    }
+
+@analysis_api_endpoint_router.post("/upload-session/complete")
+async def upload_session_complete(completion: UploadSessionComplete, request: Request = None, db: CordGuardDatabase = Depends(get_db)):
+    """
+    Finish an upload session and queue the file for analysis.
+
+    The parts are assembled in S3, the object is streamed back once to compute its hash and
+    detect its type, and the same dedup and ELF rules as /upload apply.
+
+    Args:
+        completion (UploadSessionComplete): The IDs from /upload-session and the ETag of every part
+
+    Returns:
+        dict: Upload status and analysis ID
+
+    Raises:
+        HTTPException:
+            400: Invalid session, file type or size
+            500: Server error (S3 or database failure)
+    """
+    logging.info('Upload session completion received for analysis_id: %s', completion.analysis_id)
+    check_users_host(request)
+
+    if (not ANALYSIS_ID_PATTERN.fullmatch(completion.analysis_id)
+            or not FILE_ID_PATTERN.fullmatch(completion.file_id)
+            or safe_filename(completion.file_name) != completion.file_name
+            or file_extension(completion.file_name) not in ACCEPTED_FILE_EXTENSIONS
+            or not completion.parts):
+        logging.error('Invalid upload session completion for analysis_id: %s', completion.analysis_id)
+        raise HTTPException(status_code=400, detail="Invalid upload session")
+
+    file_obj = CordGuardAnalysisFile(
+        completion.file_name, "", 0, b"", bucket_name_s3=cordguard_globals.BUCKET_NAME_S3, s3_client=None,
+        analysis_id=completion.analysis_id, file_id=completion.file_id, current_timestamp=completion.timestamp,
+        file_hash=""
+    )
+    parts = [part.model_dump() for part in completion.parts]
+    if not await asyncio.to_thread(file_obj.complete_multipart_upload, completion.upload_id, parts):
+        raise HTTPException(status_code=400, detail="Invalid upload session")
+
+    uploaded = await asyncio.to_thread(file_obj.read_uploaded_object, MAX_FILE_SIZE)
+    if uploaded is None:
+        await asyncio.to_thread(file_obj.delete_from_s3)
+        raise HTTPException(status_code=400, detail="File too large or empty")
+    file_obj.file_hash, head, file_obj.file_size = uploaded
+
+    mime_type = puremagic.magic_string(head, completion.file_name)[0].mime_type
+    logging.info('Detected MIME type: %s for file: %s', mime_type, completion.file_name)
+    if mime_type == "application/x-executable":
+        logging.error('ELF files are not supported: %s', completion.file_name)
+        await asyncio.to_thread(file_obj.delete_from_s3)
+        raise HTTPException(status_code=400, detail="ELF files are not supported yet.")
+    file_obj.file_type = mime_type
+
+    file_record = await db.get_file_record_by_file_hash(file_obj.file_hash)
+    if file_record is not None:
+        logging.info('File already in database with analysis_id: %s', file_record.analysis_id)
+        await asyncio.to_thread(file_obj.delete_from_s3)
+        return {
+            "message": "File already in database",
+            "analysis_id": file_record.analysis_id
+        }
+
+    record = await db.new_analysis_for_file(file_obj)
+    if record is None:
+        logging.error('Failed to create analysis record for file: %s', completion.file_name)
+        raise HTTPException(status_code=500, detail="Failed to create analysis record")
+
+    logging.info('File uploaded and queued for analysis with analysis_id: %s', file_obj.analysis_id)
+    return {
+        "message": "File uploaded and queued for analysis",
+        "analysis_id": file_obj.analysis_id
+    }
@@ -29,18 +29,24 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+import asyncio
 import logging
 from cordguard_worker import CordguardWorker, CordguardWorkerStatus
-from cordguard_database import CordGuardDatabase
-from cordguard_auth import CordguardAuth
+from cordguard_database import CordGuardDatabase, get_db
+from cordguard_auth import get_auth
 import os
-from cordguard_utils import is_sub_host
+from cordguard_utils import is_sub_host, is_valid_api_key
 
-logging.basicConfig(level=logging.INFO)
+# Set on the router too, so the responses are orjson-encoded wherever the router is mounted
+ds_api_endpoint_router = APIRouter(prefix="/discovery/service/api", tags=["discovery"], default_response_class=ORJSONResponse)
 
-ds_api_endpoint_router = APIRouter(prefix="/discovery/service/api", tags=["discovery"])
+# Registry API access settings, read once instead of on every request
+DEBUG = os.getenv('DEBUG') == 'true'
+REGISTRY_HOST = os.getenv('REGISTRY_HOST', 'registry.').encode()
+REGISTRY_API_KEY = os.getenv('REGISTRY_API_KEY', '').encode()
 
 class WorkerRegistration(BaseModel):
     hwid: str
@@ -48,7 +54,7 @@ class WorkerRegistration(BaseModel):
     public_ip: str
 
 @ds_api_endpoint_router.post("/register/vm/worker")
-async def register_vm_worker(registration: WorkerRegistration, request: Request):
+async def register_vm_worker(registration: WorkerRegistration, request: Request, db: CordGuardDatabase = Depends(get_db)):
     """
     Register a new VM worker node with the system.
     
@@ -79,17 +85,17 @@ async def register_vm_worker(registration: WorkerRegistration, request: Request)
     logging.info('Register VM worker request received with data: %s', registration.dict())
     
     try:
-        if os.getenv('DEBUG') == 'true':
+        if DEBUG:
             logging.info('DEBUG is true, skipping host check')
         else:
-            if not is_sub_host(request, os.getenv('REGISTRY_HOST', 'registry.')):
+            if not is_sub_host(request, REGISTRY_HOST):
                 logging.warning("Unauthorized access attempt for worker registration from host: %s", request.client.host)
                 raise HTTPException(
                     status_code=403, 
                     detail="Worker registration only allowed through registry subdomain"
             )
 
-            if request.headers.get('x-api-key') != os.getenv('REGISTRY_API_KEY'):
+            if not is_valid_api_key(request, REGISTRY_API_KEY):
                 logging.warning("Invalid Registry API key provided")
                 raise HTTPException(status_code=403, detail="Invalid Registry API key")
 
@@ -102,14 +108,14 @@ async def register_vm_worker(registration: WorkerRegistration, request: Request)
             status=CordguardWorkerStatus.NOT_ACQUIRED
         )
         logging.info('Created worker instance not saved in database yet: %s', worker.get_dict())
-        db: CordGuardDatabase = await CordGuardDatabase.create()
 
         # Verify worker signature
-        auth = CordguardAuth()
+        auth = get_auth()
         hwid_bytes = worker.hwid.encode('utf-8')
         signed_hwid_bytes = bytes.fromhex(worker.signed_hwid)
         
-        if not auth.verify(hwid_bytes, signed_hwid_bytes):
+        # Signature checks are CPU work; a worker thread keeps the event loop free for other requests
+        if not await asyncio.to_thread(auth.verify, hwid_bytes, signed_hwid_bytes):
             logging.error("Signature verification failed for worker: %s", worker.hwid)
             raise HTTPException(status_code=400, detail="VM worker is not signed")
         
@@ -117,29 +123,24 @@ async def register_vm_worker(registration: WorkerRegistration, request: Request)
         worker.is_signed = True
         logging.info('Worker marked as signed: %s', worker.get_dict())
 
-        """
-        Check if worker exists and register if new.
-        Returns existing or newly registered worker.
-        """
-        logging.info(f'Checking if worker exists: {worker.signed_hwid}')
-        existing_worker = await db.get_worker_by_signed_hwid(worker.signed_hwid)
-        if existing_worker is not None:
-            logging.info("Worker already registered: %s", existing_worker.get_dict())
+        # Existence check and registration in one round trip
+        logging.info('Registering worker: %s', worker.signed_hwid)
+        try:
+            worker, created = await db.upsert_vm_worker(worker)
+        except Exception as e:
+            logging.error('Worker registration failed for %s: %s', worker.signed_hwid, e)
+            raise HTTPException(status_code=500, detail="VM worker registration failed")
+
+        if not created:
+            logging.info("Worker already registered: %s", worker.get_dict())
             return {"status": "success", "message": "VM worker already registered"}
-        
-        logging.info(f'Registering worker: {worker.get_dict()}')
-        worker = await db.register_vm_worker(worker)
 
-        if worker:
-            logging.info(f'Worker registered successfully: {worker.get_dict()}')
-            return {"status": "success", "message": "VM worker registered successfully"}
-        
-        logging.error(f'Worker registration failed: {worker.get_dict()}')
-        raise HTTPException(status_code=500, detail="VM worker registration failed")
+        logging.info('Worker registered successfully: %s', worker.get_dict())
+        return {"status": "success", "message": "VM worker registered successfully"}
 
     except HTTPException as e:
-        logging.error(f'HTTPException registering VM worker: {e}')
+        logging.error('HTTPException registering VM worker: %s', e)
         raise e
     except Exception as e:
-        logging.error(f'Error registering VM worker: {e}')
+        logging.error('Error registering VM worker: %s', e)
         raise HTTPException(status_code=400, detail="Invalid request body")
@@ -7,6 +7,7 @@ It handles mission assignment and result collection from VM workers.
 Routes:
     /get/mission (POST): Get a new mission for a worker
     /set/result (POST): Submit analysis results for a mission
+    /ws (WebSocket): Persistent mission channel doing both, without a request per poll
 
 Dependencies:
     fastapi: Web framework for API endpoints
@@ -22,33 +23,77 @@ Maintained by: Abjad Tech Platform <hello@abjad.cc>
 Version: 1.0.0
 """
 
+import asyncio
 import logging
 import os
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from starlette.status import WS_1003_UNSUPPORTED_DATA, WS_1008_POLICY_VIOLATION
 
-from cordguard_auth import CordguardAuth
-from cordguard_database import CordGuardDatabase, CordGuardAnalysisStatus
-from cordguard_worker_mission import CordguardWorkerMission
-from cordguard_worker import CordguardWorker
+from cordguard_auth import get_auth
+from cordguard_database import CordGuardDatabase, CordGuardAnalysisStatus, get_db, wait_for_pending_analysis
 from cordguard_result import CordguardResult
-from cordguard_utils import is_sub_host
+from cordguard_worker import CordguardWorker
+from cordguard_worker_mission import CordguardWorkerMission
+from cordguard_utils import is_sub_host, is_valid_api_key
+
+# Set on the router too, so the responses are orjson-encoded wherever the router is mounted
+mission_api_endpoint_router = APIRouter(prefix="/mission/api", tags=["mission"], default_response_class=ORJSONResponse)
+
+# Worker API access settings, read once instead of on every request
+DEBUG = os.getenv('DEBUG') == 'true'
+WORKER_HOST = os.getenv('WORKER_HOST', 'workers.').encode()
+WORKER_API_KEY = os.getenv('WORKER_API_KEY', '').encode()
 
-mission_api_endpoint_router = APIRouter(prefix="/mission/api", tags=["mission"])
+# Seconds a waiting worker sleeps before checking the queue again; analyses queued by this process wake it sooner
+MISSION_POLL_INTERVAL = 2
+# Seconds /get holds the request open while no analysis is pending (long polling), 0 to answer right away
+MISSION_LONG_POLL_TIMEOUT = float(os.getenv('MISSION_LONG_POLL_TIMEOUT', '25'))
+# Long polls /get holds open at once per process; past that, idle workers get a 503 and retry later
+MISSION_MAX_LONG_POLLS = int(os.getenv('MISSION_MAX_LONG_POLLS', '500'))
+_long_poll_slots = asyncio.Semaphore(MISSION_MAX_LONG_POLLS)
+
+# Validates results sent over the mission socket exactly as /set/result validates its body
+_RESULT_ADAPTER = TypeAdapter(CordguardResult)
 
 
 class MissionGetRequest(BaseModel):
     """
     Data model for mission request payload.
     """
+    # Strict: both fields are JSON strings already, so no coercion is attempted; frozen: never modified
+    model_config = ConfigDict(strict=True, frozen=True)
+
     signed_hwid: str
     hwid: str
 
-# TODO: This endpoint("/mission/api/get") is used by the VM worker to get a new mission, it should be a websocket as it's in the state
-#       can be low latency and low bandwidth, cost and operational for a long time.
-#       This will work for now.
-@mission_api_endpoint_router.post("/get")
-async def get_mission(mission_request: MissionGetRequest, request: Request = None):
+async def require_worker_auth(request: Request):
+    """
+    Dependency guarding the worker HTTP endpoints: the request must come through the
+    workers subdomain with the Worker API key. Skipped when DEBUG is true.
+
+    Raises:
+        HTTPException:
+            403: Wrong host or invalid Worker API key
+    """
+    if DEBUG:
+        logging.info('DEBUG is true, skipping host check')
+        return
+
+    if not is_sub_host(request, WORKER_HOST):
+        logging.warning("Unauthorized access attempt from host: %s", request.client.host)
+        raise HTTPException(status_code=403, detail="Worker API only allowed through workers subdomain")
+
+    if not is_valid_api_key(request, WORKER_API_KEY):
+        logging.warning("Invalid Worker API key provided.")
+        raise HTTPException(status_code=403, detail="Invalid Worker API key")
+
+# Polling endpoint kept for existing workers; long-running workers should use the /ws mission socket below,
+# which authenticates once and pushes missions as soon as they are assigned.
+@mission_api_endpoint_router.post("/get", dependencies=[Depends(require_worker_auth)])
+async def get_mission(mission_request: MissionGetRequest, db: CordGuardDatabase = Depends(get_db)):
     """
     Get a new mission for a VM worker.
     
@@ -62,7 +107,8 @@ async def get_mission(mission_request: MissionGetRequest, request: Request = Non
         
     Raises:
         HTTPException:
-            400: Invalid request, worker already busy, or no pending analysis
+            400: Invalid request, worker already busy, or no pending analysis within MISSION_LONG_POLL_TIMEOUT seconds
+            503: No pending analysis and already MISSION_MAX_LONG_POLLS requests waiting for one
         
     Example:
         >>> POST /get/mission
@@ -72,87 +118,47 @@ async def get_mission(mission_request: MissionGetRequest, request: Request = Non
         >>> }
         >>> Returns: {"mission_id": "...", "analysis_id": "..."}
     """
-    logging.info(f'Get mission request received: {mission_request.signed_hwid}')
-    db: CordGuardDatabase = await CordGuardDatabase.create()
+    logging.debug('Get mission request received: %s', mission_request.signed_hwid)
 
-    if os.getenv('DEBUG') == 'true':
-        logging.info('DEBUG is true, skipping host check')
-    else:
-        if not is_sub_host(request, os.getenv('WORKER_HOST', 'workers.')):
-            logging.warning("Unauthorized access attempt from host: %s", request.client.host)
-            raise HTTPException(status_code=403, detail="Worker API only allowed through workers subdomain")
-    
-        if request.headers.get('x-api-key') != os.getenv('WORKER_API_KEY'):
-            logging.warning("Invalid Worker API key provided.")
-            raise HTTPException(status_code=403, detail="Invalid Worker API key")
-    
     worker = await db.get_worker_by_signed_hwid(mission_request.signed_hwid)
     if worker is None:
         logging.error("Invalid request, worker not found for signed_hwid: %s", mission_request.signed_hwid)
         raise HTTPException(status_code=400, detail="Invalid request, worker not found")
     
-    # Verify worker is available
-    if worker.is_acquired():
-        logging.info("Worker %s is already acquired.", worker.signed_hwid)
-        mission = await db.get_mission_by_worker_signed_hwid(worker.signed_hwid)
-        if mission is not None:
-            logging.info("Returning existing mission for worker %s.", worker.signed_hwid)
-            return mission.get_mission_response()
-        logging.error("Worker is acquired but no mission assigned. Contact support.")
-        raise HTTPException(status_code=500, detail="Worker is acquired but no mission assigned. Contact support.")
-    
     # Verify worker signature
-    auth = CordguardAuth()
+    auth = get_auth()
     hwid_bytes = mission_request.hwid.encode('utf-8')
-    signed_hwid_bytes = bytes.fromhex(mission_request.signed_hwid)
+    # Decoded once per worker object, which the database layer caches between polls
+    signed_hwid_bytes = worker.signed_hwid_bytes
     
-    if not auth.verify(hwid_bytes, signed_hwid_bytes):
+    # Workers poll with the same credentials, so valid signatures are remembered for a while;
+    # a signature not seen yet is verified off the event loop
+    if not await auth.verify_cached_async(hwid_bytes, signed_hwid_bytes):
         logging.error("Signature verification failed for worker: %s", mission_request.hwid)
         raise HTTPException(status_code=400, detail="VM worker is not signed")
     
-    worker.is_signed = True
-    logging.info("Worker %s is now marked as signed.", worker.signed_hwid)
-
-    async def handle_request_and_get_mission(worker: CordguardWorker) -> CordguardWorkerMission | None:
-        """
-        Find and assign a pending analysis to the worker.
-        
-        Returns:
-            CordguardWorkerMission | None: Created mission if successful
-        """
-
-        # TODO: To ensure atomicity, create a transaction method/solution. | Not important now due to very small scale
-
-        # Get pending analysis
-        analysis = await db.get_any_pending_analysis()
-        if analysis is None:
-            logging.info("No pending analysis found for worker %s.", worker.signed_hwid)
-            return None
-        
-        logging.info("Found pending analysis for worker %s: %s", worker.signed_hwid, analysis.analysis_id)
-        
-        # Update analysis status
-        analysis_updated = await db.update_analysis_record_status_by_analysis_id(
-            analysis, 
-            CordGuardAnalysisStatus.ANALYZING
-        )
-        if not analysis_updated:
-            logging.error("Failed to update analysis status for analysis_id: %s", analysis.analysis_id)
-            return None
-        
-        # Update worker status
-        worker_updated = await db.set_worker_acquired_status(worker, True)
-        if not worker_updated:
-            logging.error("Failed to update worker status for signed_hwid: %s", worker.signed_hwid)
-            return None
-        
-        # Create mission assignment
-        mission = await db.create_mission_for_worker(worker, analysis)
-        logging.info("Mission created for worker %s with analysis_id: %s", worker.signed_hwid, analysis.analysis_id)
-        return mission
+    # Persisted with the worker row by the assignment transaction below. Cached workers are
+    # usually already signed, and setting it again would drop the worker's cached dict.
+    if not worker.is_signed:
+        worker.is_signed = True
+        logging.info("Worker %s is now marked as signed.", worker.signed_hwid)
 
-    mission = await handle_request_and_get_mission(worker)
+    # Pending analysis lookup, analysis and worker status updates and mission creation, as one transaction.
+    # Whether the worker is already acquired is read from the database there, not from the cached worker,
+    # which another process may have released or acquired; an acquired worker gets its current mission back.
+    # While nothing is pending the request is held open, so idle workers do not spin on empty polls.
+    mission = await db.assign_pending_analysis(worker)
+    if mission is None and not worker.is_acquired() and MISSION_LONG_POLL_TIMEOUT > 0:
+        # Shed load instead of piling up waiting requests, each polling the database
+        if _long_poll_slots.locked():
+            logging.warning("Too many workers waiting for a mission, rejecting worker %s.", worker.signed_hwid)
+            raise HTTPException(status_code=503, detail="Too many workers waiting for a mission", headers={"Retry-After": str(MISSION_POLL_INTERVAL)})
+        async with _long_poll_slots:
+            mission = await _wait_for_mission(db, worker)
     
+    if mission is None and worker.is_acquired():
+        logging.error("Worker is acquired but no mission assigned. Contact support.")
+        raise HTTPException(status_code=500, detail="Worker is acquired but no mission assigned. Contact support.")
     if mission is None:
         logging.error("No pending analysis found for worker %s.", worker.signed_hwid)
         raise HTTPException(status_code=400, detail="No pending analysis found")
@@ -161,8 +167,8 @@ async def get_mission(mission_request: MissionGetRequest, request: Request = Non
     return mission.get_mission_response()
 
 
-@mission_api_endpoint_router.post("/set/result")
-async def set_result(result: CordguardResult, request: Request = None):
+@mission_api_endpoint_router.post("/set/result", dependencies=[Depends(require_worker_auth)])
+async def set_result(result: CordguardResult, db: CordGuardDatabase = Depends(get_db)):
     """
     Submit analysis results for a completed mission.
     
@@ -181,60 +187,167 @@ async def set_result(result: CordguardResult, request: Request = None):
         >>> }
         >>> Returns: {"message": "Results received"}
     """
-    logging.info('Set result request received for analysis_id: %s', result.analysis_id)
-    
-    if os.getenv('DEBUG') == 'true':
-        logging.info('DEBUG is true, skipping host check')
-    else:
-        if not is_sub_host(request, os.getenv('WORKER_HOST', 'workers.')):
-            logging.warning("Unauthorized access attempt from host: %s", request.client.host)
-            raise HTTPException(status_code=403, detail="Worker API only allowed through workers subdomain")
-    
-        if request.headers.get('x-api-key') != os.getenv('WORKER_API_KEY'):
-            logging.warning("Invalid Worker API key provided.")
-            raise HTTPException(status_code=403, detail="Invalid Worker API key")
-    
-    # Set result in database
-    db: CordGuardDatabase = await CordGuardDatabase.create()
-    analysis_record = await db.get_analysis_record_by_analysis_id(result.analysis_id)
-    if analysis_record is None:
-        logging.error("Analysis not found for analysis_id: %s", result.analysis_id)
-        return {"message": "Analysis not found"}
-    
+    logging.debug('Set result request received for analysis_id: %s', result.analysis_id)
+
+    return await _save_result(db, result)
+
+async def _save_result(db: CordGuardDatabase, result: CordguardResult) -> dict:
+    """
+    Store a mission result and release its worker, shared by /set/result and the mission WebSocket.
+
+    Returns:
+        dict: The response message for the worker
+    """
     # Set analysis to completed or failed based on results
     if result.type == "unknown":
         logging.info("Setting analysis status to FAILED for analysis_id: %s", result.analysis_id)
-        analysis_updated = await db.update_analysis_record_status_by_analysis_id(
-            analysis_record,
-            CordGuardAnalysisStatus.FAILED
-        )
+        status = CordGuardAnalysisStatus.FAILED
     else:
         logging.info("Setting analysis status to COMPLETED for analysis_id: %s", result.analysis_id)
-        analysis_updated = await db.update_analysis_record_status_by_analysis_id(
-            analysis_record,
-            CordGuardAnalysisStatus.COMPLETED
-        )
-    
-    if not analysis_updated:
-        logging.error("Failed to update analysis status for analysis_id: %s", result.analysis_id)
-        return {"message": "Failed to update analysis status"}
-    
-    # Update machine state to not acquired
-    worker = await db.get_worker_by_signed_hwid(result.signed_hwid)
-    if worker is None:
+        status = CordGuardAnalysisStatus.COMPLETED
+
+    # Analysis status, worker release and result record, as one transaction
+    saved = await db.save_mission_result(result, status)
+    if saved is None:
+        logging.error("Failed to save result for analysis_id: %s", result.analysis_id)
+        return {"message": "Failed to create result"}
+
+    analysis_found, worker_found = saved
+    if not analysis_found:
+        logging.error("Analysis not found for analysis_id: %s", result.analysis_id)
+        return {"message": "Analysis not found"}
+    if not worker_found:
         logging.error("Worker not found for signed_hwid: %s", result.signed_hwid)
         return {"message": "Worker not found"}
-    
-    worker_updated = await db.set_worker_acquired_status(worker, False)
-    if not worker_updated:
-        logging.error("Failed to update worker state for signed_hwid: %s", result.signed_hwid)
-        return {"message": "Failed to update worker state"}
-
-    # Create result in database
-    result_created = await db.create_result_for_mission(result.analysis_id, result.get_dict())
-    if not result_created:
-        logging.error("Failed to create result for analysis_id: %s", result.analysis_id)
-        return {"message": "Failed to create result"}
 
     logging.info("Results received for analysis_id: %s", result.analysis_id)
-    return {"message": "Results received"}
\ No newline at end of file
+    return {"message": "Results received"}
+
+async def _wait_for_mission(db: CordGuardDatabase, worker: CordguardWorker) -> CordguardWorkerMission | None:
+    """
+    Wait up to MISSION_LONG_POLL_TIMEOUT seconds for a pending analysis to assign to a free worker,
+    after a first assignment attempt found none. Callers hold a _long_poll_slots slot meanwhile.
+
+    Returns:
+        CordguardWorkerMission | None: The mission, None if nothing was assigned in time or the
+        worker turned out to be acquired without a mission
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MISSION_LONG_POLL_TIMEOUT
+    mission = None
+    while mission is None and not worker.is_acquired() and (remaining := deadline - loop.time()) > 0:
+        await wait_for_pending_analysis(min(remaining, MISSION_POLL_INTERVAL))
+        mission = await db.assign_pending_analysis(worker)
+    return mission
+
+def _parse_socket_message(event: dict) -> dict:
+    """
+    Decode an ASGI websocket event holding a JSON text message.
+
+    Raises:
+        WebSocketDisconnect: If the event is the worker disconnecting
+    """
+    if event['type'] == 'websocket.disconnect':
+        raise WebSocketDisconnect(event.get('code', 1000))
+    return orjson.loads(event.get('text'))
+
+async def _wait_for_mission_or_message(db: CordGuardDatabase, worker: CordguardWorker,
+                                       websocket: WebSocket) -> tuple[CordguardWorkerMission | None, dict | None]:
+    """
+    Wait for a mission like _wait_for_mission, while still reading the socket.
+
+    The wait stops as soon as the worker disconnects or sends another message, so a closed
+    socket neither keeps polling the database nor takes an analysis it cannot receive.
+
+    Returns:
+        tuple[CordguardWorkerMission | None, dict | None]: The mission, or None; and the
+        message that interrupted the wait, if any
+
+    Raises:
+        WebSocketDisconnect: If the worker disconnected while waiting
+    """
+    waiting = asyncio.ensure_future(_wait_for_mission(db, worker))
+    receiving = asyncio.ensure_future(websocket.receive())
+    try:
+        await asyncio.wait((waiting, receiving), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (waiting, receiving):
+            task.cancel()
+        await asyncio.gather(waiting, receiving, return_exceptions=True)
+    if not receiving.cancelled():
+        # An analysis assigned meanwhile stays the worker's mission, returned by its next get
+        return None, _parse_socket_message(receiving.result())
+    return waiting.result(), None
+
+@mission_api_endpoint_router.websocket("/ws")
+async def mission_socket(websocket: WebSocket, db: CordGuardDatabase = Depends(get_db)):
+    """
+    Persistent mission channel for a VM worker.
+
+    Replaces polling /get and calling /set/result: the worker is authenticated and its
+    signature verified once per connection, and missions are sent as soon as one is assigned.
+
+    Protocol (JSON text messages):
+        worker -> {"signed_hwid": "...", "hwid": "..."}     first message, as the /get body
+        worker -> {"op": "get"}                            wait for the next mission, as /get does
+        server -> mission response, as returned by /get, or {"message": "..."} when there is none
+        worker -> {"op": "result", "result": {...}}        the /set/result body
+        server -> {"message": "..."}, as returned by /set/result
+    """
+    if not DEBUG and (not is_sub_host(websocket, WORKER_HOST) or not is_valid_api_key(websocket, WORKER_API_KEY)):
+        logging.warning("Unauthorized mission socket attempt from host: %s", websocket.client.host if websocket.client else None)
+        await websocket.close(code=WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    try:
+        hello = MissionGetRequest.model_validate_json(await websocket.receive_text())
+        worker = await db.get_worker_by_signed_hwid(hello.signed_hwid)
+        if worker is None or not await get_auth().verify_cached_async(hello.hwid.encode('utf-8'), worker.signed_hwid_bytes):
+            logging.error("Mission socket rejected for worker: %s", hello.signed_hwid)
+            await websocket.close(code=WS_1008_POLICY_VIOLATION)
+            return
+        # As in /get: persisted with the worker row when a mission is assigned to it
+        if not worker.is_signed:
+            worker.is_signed = True
+            logging.info("Worker %s is now marked as signed.", worker.signed_hwid)
+        logging.info("Mission socket opened for worker %s.", worker.signed_hwid)
+
+        # A message that arrived while waiting for a mission, handled before reading the next one
+        pending = None
+        while True:
+            message = pending if pending is not None else _parse_socket_message(await websocket.receive())
+            pending = None
+            op = message.get('op')
+            if op == 'get':
+                mission = await db.assign_pending_analysis(worker)
+                if mission is None and not worker.is_acquired() and MISSION_LONG_POLL_TIMEOUT > 0:
+                    # Waiting sockets count against the same limit as waiting /get requests
+                    if _long_poll_slots.locked():
+                        logging.warning("Too many workers waiting for a mission, rejecting worker %s.", worker.signed_hwid)
+                        await websocket.send_text(orjson.dumps({"message": "Too many workers waiting for a mission"}).decode())
+                        continue
+                    async with _long_poll_slots:
+                        mission, pending = await _wait_for_mission_or_message(db, worker, websocket)
+                    if pending is not None:
+                        continue
+                if mission is None:
+                    response = {"message": "Worker is acquired but no mission assigned" if worker.is_acquired() else "No pending analysis found"}
+                else:
+                    response = mission.get_mission_response()
+                await websocket.send_text(orjson.dumps(response).decode())
+            elif op == 'result':
+                result = _RESULT_ADAPTER.validate_python(message.get('result') or {})
+                # A worker can only report for itself
+                result.signed_hwid = worker.signed_hwid
+                response = await _save_result(db, result)
+                if response["message"] == "Results received":
+                    worker.set_acquired(False)
+                await websocket.send_text(orjson.dumps(response).decode())
+            else:
+                await websocket.send_text(orjson.dumps({"message": "Unknown op"}).decode())
+    except WebSocketDisconnect:
+        logging.info("Mission socket closed.")
+    except (ValidationError, ValueError, TypeError, AttributeError) as e:
+        logging.error("Invalid message on mission socket: %s", e)
+        await websocket.close(code=WS_1003_UNSUPPORTED_DATA)